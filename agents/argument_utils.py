@@ -1,18 +1,50 @@
+import re
+import contextvars
+from contextlib import contextmanager
+from llm_backends import PrefixedPrompt
+from .prompt_budget import get_budget, select_evidence, truncate_tokens, count_tokens
+
+# Evidence references as the prompts label them: [E1], E2, ...
+_EVIDENCE_REF = re.compile(r"\bE(\d+)\b")
+
+
+def _evidence_line(i, e):
+    return f"[E{i}] {e['text'][:200]} (confidence={round(e['score'], 2)})"
+
+
 def format_evidence(evidence_list):
     if not evidence_list:
         return "No external evidence provided."
 
     lines = []
     for i, e in enumerate(evidence_list, 1):
-        lines.append(
-            f"[E{i}] {e['text'][:200]} (confidence={round(e['score'], 2)})"
-        )
+        lines.append(_evidence_line(i, e))
     return "\n".join(lines)
 
 
-def build_argument_prompt(role, case, evidence_list, memory_text):
+def memory_prompt(role, memory):
+    """
+    The memory section for a role, folded to fit its token budget.
+    The case is left out; the prompt carries it already.
+    """
+    return memory.get_memory_prompt(max_tokens=get_budget(role).memory_tokens, include_case=False)
+
+
+def _shared_prefix(case, evidence_list, budget):
+    """
+    The part of every argument prompt that is the same for both sides
+    and all rounds of a hearing: rules, case and evidence.
+    """
+    case = truncate_tokens(case, budget.case_tokens)
+    evidence_list = select_evidence(
+        evidence_list,
+        budget.evidence_tokens,
+        budget.max_evidence_items,
+        render=lambda e: _evidence_line(budget.max_evidence_items, e)
+    )
+
     return f"""
-You are a {role} in a traffic violation court.
+Traffic violation court hearing.
 
 RULES:
 - Max 120 words
@@ -25,12 +57,133 @@ CASE:
 
 EVIDENCE:
 {format_evidence(evidence_list)}
+"""
+
+
+class PromptPrefixCache:
+    """
+    Shared prompt prefixes of one hearing, built once and reused by every
+    turn. Counts the prefix tokens reused, i.e. sent again unchanged and
+    so eligible for provider-side prompt caching.
+    """
+
+    def __init__(self):
+        self._prefixes = {}
+        self.builds = 0
+        self.hits = 0
+        self.prefix_tokens = 0
+        self.reused_tokens = 0
+
+    def get(self, case, evidence_list, budget):
+        key = (
+            case,
+            tuple((e.get("text"), e.get("score", 0)) for e in evidence_list),
+            (budget.case_tokens, budget.evidence_tokens, budget.max_evidence_items),
+        )
+        entry = self._prefixes.get(key)
+        if entry is None:
+            prefix = _shared_prefix(case, evidence_list, budget)
+            entry = self._prefixes[key] = (prefix, count_tokens(prefix))
+            self.builds += 1
+            self.prefix_tokens += entry[1]
+        else:
+            self.hits += 1
+            self.reused_tokens += entry[1]
+        return entry[0]
+
+    def stats(self):
+        return {
+            "prefix_builds": self.builds,
+            "prefix_hits": self.hits,
+            "prefix_tokens": self.prefix_tokens,
+            "prefix_reused_tokens": self.reused_tokens,
+        }
 
+
+# Prefix cache of the hearing the current code runs for
+current_prefix_cache = contextvars.ContextVar("current_prefix_cache", default=None)
+
+
+@contextmanager
+def bind_prefix_cache(cache):
+    """
+    Argument prompts built inside the block share prefixes through cache.
+    """
+    token = current_prefix_cache.set(cache)
+    try:
+        yield cache
+    finally:
+        try:
+            current_prefix_cache.reset(token)
+        except ValueError:
+            # Finalized from another context (abandoned stream); nothing to restore
+            pass
+
+
+def build_argument_prompt(role, case, evidence_list, memory_text, budget=None):
+    """
+    Argument prompt within the role's token budget: a shared prefix (rules,
+    case trimmed to its cap, evidence ranked by score, deduplicated and cut
+    to what fits), memoized per hearing, then the role and memory.
+    """
+    budget = budget or get_budget(role)
+    cache = current_prefix_cache.get()
+    if cache is not None:
+        prefix = cache.get(case, evidence_list, budget)
+    else:
+        prefix = _shared_prefix(case, evidence_list, budget)
+    memory_text = truncate_tokens(memory_text, budget.memory_tokens, keep="tail")
+
+    return PrefixedPrompt(prefix, f"""
 PREVIOUS CONTEXT:
 {memory_text}
 
-Produce your argument now.
-"""
+You are the {role}. Produce your argument now.
+""")
+
+
+def revise_argument_prompt(role, case, evidence_list, draft, opposing_argument, budget=None):
+    """
+    Prompt to adapt an argument drafted before the opposing side spoke:
+    the same shared prefix (rules, case, evidence) as build_argument_prompt,
+    then the draft and the opposing argument.
+    """
+    budget = budget or get_budget(role)
+    cache = current_prefix_cache.get()
+    if cache is not None:
+        prefix = cache.get(case, evidence_list, budget)
+    else:
+        prefix = _shared_prefix(case, evidence_list, budget)
+    opposing_argument = truncate_tokens(opposing_argument, budget.memory_tokens, keep="tail")
+
+    return PrefixedPrompt(prefix, f"""
+YOUR DRAFT:
+{draft}
+
+OPPOSING ARGUMENT:
+{opposing_argument}
+
+You are the {role}. Revise your draft: answer the opposing argument
+directly and keep the points of your draft that still apply.
+""")
+
+
+def cited_evidence(text):
+    """
+    Evidence numbers referenced in an argument, e.g. {"1", "3"}.
+    """
+    return set(_EVIDENCE_REF.findall(text or ""))
+
+
+def draft_answers(draft, opposing_argument):
+    """
+    True when a speculative draft already addresses every piece of
+    evidence the opposing argument relies on, so it can stand unrevised.
+    An argument citing no evidence gives nothing to check the draft
+    against, so the draft never stands in that case.
+    """
+    cited = cited_evidence(opposing_argument)
+    return bool(cited) and cited <= cited_evidence(draft)
 
 
 def classify_argument_prompt(argument):
@@ -1,14 +1,53 @@
+import asyncio
+from llm_backends import get_llm_backend, resolve_llm
+from database.tracing import span, traced_stream, estimate_tokens
+
+
 class BaseAgent:
     """
     Base class for all debate agents.
     """
 
-    def __init__(self, name: str, llm):
+    def __init__(self, name: str, llm=None, allm=None, stream_llm=None):
         self.name = name
+        # llm may be a callable, a backend name from llm_backends, or None for the default backend
+        if llm is None:
+            llm = get_llm_backend()
+        llm, allm, stream_llm = resolve_llm(llm, allm, stream_llm)
         self.llm = llm
+        # Optional async client (e.g. llm_openrouter.alc_llm)
+        self.allm = allm
+        # Optional token-streaming client (e.g. llm_openrouter.lc_llm_stream)
+        self.stream_llm = stream_llm
 
     def generate(self, prompt: str) -> str:
         """
         Sends a prompt to the LLM.
         """
-        return self.llm(prompt)
\ No newline at end of file
+        with span(f"llm.{self.name}", prompt_tokens=estimate_tokens(prompt)) as sp:
+            completion = self.llm(prompt)
+            sp["completion_tokens"] = estimate_tokens(completion)
+        return completion
+
+    def stream(self, prompt: str):
+        """
+        Yields the completion as it is generated. Without a streaming
+        client the full completion is yielded as a single chunk.
+        """
+        if self.stream_llm is not None:
+            yield from traced_stream(f"llm.{self.name}", self.stream_llm(prompt), prompt_tokens=estimate_tokens(prompt))
+        else:
+            yield self.generate(prompt)
+
+    async def agenerate(self, prompt: str) -> str:
+        """
+        Async variant of generate. Without an async client the sync
+        call runs on a worker thread so the event loop stays free.
+        """
+        with span(f"llm.{self.name}", prompt_tokens=estimate_tokens(prompt)) as sp:
+            if self.allm is not None:
+                completion = await self.allm(prompt)
+            else:
+                completion = await asyncio.to_thread(self.llm, prompt)
+            sp["completion_tokens"] = estimate_tokens(completion)
+        return completion
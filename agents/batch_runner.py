@@ -0,0 +1,262 @@
+"""
+Batch hearing runner: adjudicates a backlog of cases through DebatePipeline.
+
+    python -m agents.batch_runner cases.jsonl --out judgements.jsonl
+    python -m agents.batch_runner cases.csv --concurrency 16 --rpm 300
+    python -m agents.batch_runner db --retrieve     # reads the cases table
+    python -m agents.batch_runner cases.jsonl --backend stub   # offline load test
+    python -m agents.batch_runner cases.jsonl --pipelined --revise auto   # speculative defense drafts
+
+Judgements are appended to the output JSONL as each hearing finishes.
+Re-running with the same output file skips cases already judged.
+"""
+import os
+import csv
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+from typing import List, Dict
+from agents.debate_pipeline import DebatePipeline, REVISE_MODES
+from llm_backends import get_llm_backend, resolve_llm, llm_backend_names
+from rag.db import get_conn, init_db
+from database.logger import flush_logs, AuditWriteError
+
+
+# ----------------------------------
+# Case sources
+# ----------------------------------
+def load_cases(source: str) -> List[Dict]:
+    """
+    Reads cases as [{case_id, facts, title?, evidence?}, ...] from
+    a .jsonl or .csv file, or from the cases table when source is "db".
+    """
+    if source == "db":
+        conn = get_conn()
+        cur = conn.cursor()
+        cur.execute("SELECT id, title, facts FROM cases ORDER BY created_at, id")
+        rows = cur.fetchall()
+        conn.close()
+        return [{"case_id": cid, "title": title, "facts": facts} for cid, title, facts in rows]
+
+    cases = []
+    if source.endswith(".csv"):
+        with open(source, newline="", encoding="utf-8") as f:
+            for i, row in enumerate(csv.DictReader(f)):
+                cases.append({
+                    "case_id": row.get("case_id") or row.get("id") or str(i),
+                    "title": row.get("title", ""),
+                    "facts": row["facts"],
+                })
+    else:
+        with open(source, encoding="utf-8") as f:
+            for i, line in enumerate(f):
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                row["case_id"] = str(row.get("case_id") or row.get("id") or i)
+                cases.append(row)
+    return cases
+
+
+def completed_case_ids(output_path: str) -> set:
+    """
+    Case ids already judged successfully in an existing output file.
+    A partially written last line (crash mid-write) is ignored.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if row.get("status") == "ok":
+                done.add(str(row["case_id"]))
+    return done
+
+
+# ----------------------------------
+# Rate limiting
+# ----------------------------------
+class RateLimiter:
+    """
+    Spaces calls evenly so at most `per_minute` start in any minute.
+    """
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def rate_limited(allm, limiter: RateLimiter):
+    async def call(prompt: str) -> str:
+        await limiter.wait()
+        return await allm(prompt)
+    return call
+
+
+# ----------------------------------
+# Batch execution
+# ----------------------------------
+async def run_batch(
+    cases: List[Dict],
+    output_path: str,
+    llm,
+    allm=None,
+    rounds: int = 1,
+    concurrency: int = 8,
+    requests_per_minute: float = None,
+    retrieve_evidence: bool = False,
+    top_k: int = 5,
+    rubric=None,
+    pipelined: bool = False,
+    revise: str = "always",
+    log=print
+) -> Dict:
+    """
+    Runs every case not yet in output_path with at most `concurrency`
+    hearings in flight and LLM calls capped at requests_per_minute.
+    Returns run stats including cases per minute, and "audit_error"
+    when audit entries could not be written.
+    """
+    # Audit tables must exist before the first hearing logs to them
+    init_db()
+
+    done = completed_case_ids(output_path)
+    todo = [c for c in cases if str(c["case_id"]) not in done]
+    log(f"{len(cases)} cases, {len(done)} already judged, {len(todo)} to run")
+
+    llm, allm, _ = resolve_llm(llm, allm)
+    if requests_per_minute:
+        limiter = RateLimiter(requests_per_minute)
+        if allm is not None:
+            allm = rate_limited(allm, limiter)
+        else:
+            allm = rate_limited(lambda prompt: asyncio.to_thread(llm, prompt), limiter)
+
+    if retrieve_evidence:
+        from rag.retriever import retrieve
+
+    semaphore = asyncio.Semaphore(concurrency)
+    stats = {"ok": 0, "error": 0, "skipped": len(done)}
+    started = time.perf_counter()
+
+    with open(output_path, "a+", encoding="utf-8") as out:
+        # Terminate a line cut short by a crash so new rows start cleanly
+        if out.tell():
+            out.seek(out.tell() - 1)
+            if out.read(1) != "\n":
+                out.write("\n")
+
+        def write(row):
+            # One complete line per hearing, flushed so a crash loses at most the line in flight
+            out.write(json.dumps(row, default=str) + "\n")
+            out.flush()
+
+        async def hear(case):
+            async with semaphore:
+                debate_id = f"batch_{case['case_id']}_{uuid.uuid4().hex[:8]}"
+                try:
+                    pipeline = DebatePipeline(
+                        llm=llm, debate_id=debate_id, allm=allm, rubric=rubric, case_id=str(case["case_id"])
+                    )
+                    evidence = case.get("evidence") or []
+                    if retrieve_evidence and not evidence:
+                        evidence = await asyncio.to_thread(retrieve, case["facts"], top_k)
+                    for ev in evidence:
+                        pipeline.submit_evidence(ev)
+
+                    judgement = await pipeline.arun(case["facts"], rounds=rounds, pipelined=pipelined, revise=revise)
+                    write({
+                        "case_id": case["case_id"],
+                        "debate_id": debate_id,
+                        "status": "ok",
+                        "judgement": judgement.dict(),
+                    })
+                    stats["ok"] += 1
+                except Exception as e:
+                    write({
+                        "case_id": case["case_id"],
+                        "debate_id": debate_id,
+                        "status": "error",
+                        "error": f"{type(e).__name__}: {e}",
+                    })
+                    stats["error"] += 1
+
+                finished = stats["ok"] + stats["error"]
+                if finished % 25 == 0 or finished == len(todo):
+                    elapsed = time.perf_counter() - started
+                    log(f"  {finished}/{len(todo)} hearings, {finished / elapsed * 60:.1f} cases/min")
+
+        await asyncio.gather(*(hear(case) for case in todo))
+
+    # Judgements are only durable once the audit queue has drained
+    try:
+        await asyncio.to_thread(flush_logs)
+    except AuditWriteError as e:
+        stats["audit_error"] = str(e)
+        log(f"  audit log incomplete: {e}")
+
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = round(elapsed, 2)
+    stats["cases_per_minute"] = round((stats["ok"] + stats["error"]) / elapsed * 60, 1) if elapsed else 0.0
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Adjudicate a batch of traffic cases.")
+    parser.add_argument("source", help='cases .jsonl / .csv file, or "db" for the cases table')
+    parser.add_argument("--out", default="judgements.jsonl", help="JSONL output (appended, used for resume)")
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=8, help="hearings in flight")
+    parser.add_argument("--rpm", type=float, default=None, help="max LLM requests per minute")
+    parser.add_argument("--retrieve", action="store_true", help="fetch evidence for cases without any")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--pipelined", action="store_true",
+                        help="draft defense turns while the prosecutor argues (no effect with --revise always)")
+    parser.add_argument("--revise", choices=REVISE_MODES, default="always",
+                        help="always: no drafts, same as serial; auto: revise drafts missing the prosecution's evidence; "
+                             "never: keep every draft (about one LLM round-trip less per round, drafts may miss the prosecution's points)")
+    parser.add_argument("--rubric", default=None, help="rubric name in data/rubrics or spec path (default: COURTROOM_RUBRIC or default)")
+    parser.add_argument("--backend", choices=llm_backend_names(), default=None,
+                        help="LLM backend (default: COURTROOM_LLM_BACKEND or openrouter)")
+    args = parser.parse_args(argv)
+
+    # "db" reads the cases table, which must exist on a fresh database
+    init_db()
+    stats = asyncio.run(run_batch(
+        load_cases(args.source),
+        args.out,
+        llm=get_llm_backend(args.backend),
+        rounds=args.rounds,
+        concurrency=args.concurrency,
+        requests_per_minute=args.rpm,
+        retrieve_evidence=args.retrieve,
+        top_k=args.top_k,
+        rubric=args.rubric,
+        pipelined=args.pipelined,
+        revise=args.revise,
+        log=lambda msg: print(msg, file=sys.stderr),
+    ))
+    print(json.dumps(stats))
+    if "audit_error" in stats:
+        sys.exit(1)
+    return stats
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from .base_agent import BaseAgent
-from .argument_utils import build_argument_prompt, classify_argument_prompt, summarize_prompt
+import asyncio
+from .argument_utils import build_argument_prompt, classify_argument_prompt, summarize_prompt, memory_prompt, revise_argument_prompt
 
 class DefenseAgent(BaseAgent):
 
@@ -8,7 +9,7 @@ class DefenseAgent(BaseAgent):
             role="Defense Lawyer",
             case=case,
             evidence_list=evidence_list,
-            memory_text=memory.get_memory_prompt()
+            memory_text=memory_prompt("Defense Lawyer", memory)
         )
         argument = self.generate(prompt)
         return argument
@@ -19,3 +20,52 @@ class DefenseAgent(BaseAgent):
     def summarize(self, argument):
         return self.generate(summarize_prompt(argument))
 
+    def stream_argument(self, case, evidence_list, memory):
+        """
+        Yields the argument token by token.
+        """
+        prompt = build_argument_prompt(
+            role="Defense Lawyer",
+            case=case,
+            evidence_list=evidence_list,
+            memory_text=memory_prompt("Defense Lawyer", memory)
+        )
+        yield from self.stream(prompt)
+
+    # ----------------------------------
+    # Async variants
+    # ----------------------------------
+    async def agenerate_argument(self, case, evidence_list, memory):
+        prompt = build_argument_prompt(
+            role="Defense Lawyer",
+            case=case,
+            evidence_list=evidence_list,
+            memory_text=memory_prompt("Defense Lawyer", memory)
+        )
+        argument = await self.agenerate(prompt)
+        return argument
+
+    def draft_argument(self, case, evidence_list, memory):
+        """
+        Starts drafting an argument before the prosecutor's turn lands.
+        The prompt is built now, from the memory as it stands; returns a
+        task resolving to the draft.
+        """
+        prompt = build_argument_prompt(
+            role="Defense Lawyer",
+            case=case,
+            evidence_list=evidence_list,
+            memory_text=memory_prompt("Defense Lawyer", memory)
+        )
+        return asyncio.ensure_future(self.agenerate(prompt))
+
+    async def arevise_argument(self, case, evidence_list, draft, prosecutor_argument):
+        return await self.agenerate(
+            revise_argument_prompt("Defense Lawyer", case, evidence_list, draft, prosecutor_argument)
+        )
+
+    async def aclassify(self, argument):
+        return await self.agenerate(classify_argument_prompt(argument))
+
+    async def asummarize(self, argument):
+        return await self.agenerate(summarize_prompt(argument))
@@ -1,8 +1,15 @@
 import uuid
+import asyncio
 from typing import List, Dict
 from models.pydantic_models import JudgementModel
 from rag.fact_witness import fact_witness_answer
 from database.logger import log_judgement
+from llm_backends import resolve_llm
+from database.tracing import span, traced_stream, estimate_tokens
+from agents.rubric import get_rubric
+
+# Case id recorded when a hearing is not tied to a stored case
+DEFAULT_CASE_ID = "AUTO-CASE"
 
 
 class JudgeAgent:
@@ -11,12 +18,20 @@ class JudgeAgent:
     and produces a final JudgementModel with possible benefit of doubt.
     """
 
-    def __init__(self, name: str = "judge", llm=None):
+    def __init__(self, name: str = "judge", llm=None, allm=None, stream_llm=None, rubric=None):
         self.name = name
+        # Rubric name, spec path or compiled Rubric; None uses COURTROOM_RUBRIC / "default"
+        self.rubric = get_rubric(rubric)
+        # llm may be a callable or a backend name; without one, deliberation uses fallback reasoning
+        llm, allm, stream_llm = resolve_llm(llm, allm, stream_llm)
         self.llm = llm
+        # Optional async client (e.g. llm_openrouter.alc_llm)
+        self.allm = allm
+        # Optional token-streaming client (e.g. llm_openrouter.lc_llm_stream)
+        self.stream_llm = stream_llm
 
     # ----------------------------------
-    # Improved Rubric Scoring (0–100)
+    # Rubric Scoring (0–100)
     # ----------------------------------
     def _score_arguments(
         self,
@@ -25,58 +40,23 @@ class JudgeAgent:
         evidence: List[Dict],
         case_facts: str
     ) -> Dict[str, float]:
+        return self.rubric.score(case_facts, prosecutor_text, defense_text, evidence)
 
-        # 1. Evidence Strength
-        evidence_strength = min(sum(e.get("score", 0) for e in evidence) * 100, 100)
-
-        # 2. Prosecutor Legal Application
-        legal_application = 50
-        legal_keywords = [
-            "law", "section", "act", "rule",
-            "traffic", "penalty", "fine",
-            "violation", "offence"
-        ]
-        if any(k in prosecutor_text.lower() for k in legal_keywords):
-            legal_application += 25
-        legal_application = min(legal_application, 100)
-
-        # 3. Defense Effectiveness
-        defense_effectiveness = 50
-        defense_keywords = [
-            "however", "no evidence", "not proven",
-            "reasonable doubt", "lack", "insufficient",
-            "no witness", "procedural error"
-        ]
-        if any(k in defense_text.lower() for k in defense_keywords):
-            defense_effectiveness += 20
-        defense_effectiveness = min(defense_effectiveness, 100)
-
-        # 4. Consistency with Case Facts (keyword matching)
-        case_words = set(word.lower() for word in case_facts.split())
-        prosecutor_words = set(word.lower() for word in prosecutor_text.split())
-        defense_words = set(word.lower() for word in defense_text.split())
-
-        matches = len(case_words & (prosecutor_words | defense_words))
-        consistency = min((matches / len(case_words)) * 100, 100) if case_words else 50
-
-        # 5. Credibility of Evidence
-        credibility = 50
-        if evidence and any(e.get("verified", False) for e in evidence):
-            credibility += 20
-        credibility = min(credibility, 100)
-
-        return {
-            "evidence_strength": round(evidence_strength, 2),
-            "legal_application": round(legal_application, 2),
-            "defense_effectiveness": round(defense_effectiveness, 2),
-            "consistency": round(consistency, 2),
-            "credibility": round(credibility, 2)
-        }
+    def score_batch(self, items) -> List[Dict]:
+        """
+        Rubric scores and verdicts for many (case_facts, prosecutor_text,
+        defense_text, evidence) tuples in one call, equal to what evaluate
+        computes for each: [{"scores", "final_score", "prosecution_score",
+        "defense_score", "verdict"}, ...]. Nothing is logged.
+        """
+        items = list(items)
+        with span("judge.score_batch", hearings=len(items), rubric=self.rubric.version):
+            return self.rubric.score_batch(items)
 
     # ----------------------------------
     # Judge Deliberation (LLM reasoning)
     # ----------------------------------
-    def deliberate(
+    def _deliberation_prompt(
         self,
         verdict: str,
         case: str,
@@ -84,10 +64,6 @@ class JudgeAgent:
         prosecutor_argument: str,
         defense_argument: str
     ) -> str:
-        """
-        LLM generates reasoning but MUST respect final verdict.
-        """
-
         prompt = f"""
 You are a judge in a Pakistani traffic law courtroom.
 
@@ -117,11 +93,112 @@ DEFENSE SUMMARY:
 Provide legal reasoning and punishment (if applicable).
 Mention confidence explicitly.
 """
+        return prompt
+
+    def _fallback_reasoning(self, verdict: str, confidence: float) -> str:
+        return f"The court finds: {verdict} with confidence {confidence} based on the presented facts and evidence."
+
+    def deliberate(
+        self,
+        verdict: str,
+        case: str,
+        confidence: float,
+        prosecutor_argument: str,
+        defense_argument: str
+    ) -> str:
+        """
+        LLM generates reasoning but MUST respect final verdict.
+        """
+        prompt = self._deliberation_prompt(
+            verdict, case, confidence, prosecutor_argument, defense_argument
+        )
 
         if self.llm:
-            return self.llm(prompt)
+            with span("llm.judge", prompt_tokens=estimate_tokens(prompt)) as sp:
+                reasoning = self.llm(prompt)
+                sp["completion_tokens"] = estimate_tokens(reasoning)
+            return reasoning
 
-        return f"The court finds: {verdict} with confidence {confidence} based on the presented facts and evidence."
+        return self._fallback_reasoning(verdict, confidence)
+
+    def stream_deliberate(
+        self,
+        verdict: str,
+        case: str,
+        confidence: float,
+        prosecutor_argument: str,
+        defense_argument: str
+    ):
+        """
+        Yields the deliberation token by token.
+        """
+        if self.stream_llm:
+            prompt = self._deliberation_prompt(
+                verdict, case, confidence, prosecutor_argument, defense_argument
+            )
+            yield from traced_stream("llm.judge", self.stream_llm(prompt), prompt_tokens=estimate_tokens(prompt))
+        else:
+            yield self.deliberate(verdict, case, confidence, prosecutor_argument, defense_argument)
+
+    async def adeliberate(
+        self,
+        verdict: str,
+        case: str,
+        confidence: float,
+        prosecutor_argument: str,
+        defense_argument: str
+    ) -> str:
+        """
+        Async variant of deliberate.
+        """
+        prompt = self._deliberation_prompt(
+            verdict, case, confidence, prosecutor_argument, defense_argument
+        )
+
+        if self.allm or self.llm:
+            with span("llm.judge", prompt_tokens=estimate_tokens(prompt)) as sp:
+                if self.allm:
+                    reasoning = await self.allm(prompt)
+                else:
+                    reasoning = await asyncio.to_thread(self.llm, prompt)
+                sp["completion_tokens"] = estimate_tokens(reasoning)
+            return reasoning
+
+        return self._fallback_reasoning(verdict, confidence)
+
+    # ----------------------------------
+    # Verdict from rubric scores
+    # ----------------------------------
+    def _decide(self, scores: Dict[str, float]):
+        """
+        Returns (final_score, prosecution_score, defense_score, verdict).
+        """
+        return self.rubric.decide(scores)
+
+    def _build_judgement(
+        self,
+        case: str,
+        scores: Dict[str, float],
+        prosecution_score: float,
+        verdict: str,
+        reasoning: str,
+        evidence_list: List[Dict],
+        hearing_log: List[Dict],
+        case_id: str = DEFAULT_CASE_ID
+    ) -> JudgementModel:
+        return JudgementModel(
+            judgement_id=str(uuid.uuid4()),
+            case_id=case_id,
+            verdict=verdict,
+            prosecution_score=round(prosecution_score, 2),
+            defense_score=round(scores["defense_effectiveness"], 2),
+            rubric_scores=scores,
+            rubric_version=self.rubric.version,
+            reasoning=reasoning,
+            case_facts=case,
+            evidence_considered=evidence_list,
+            hearing_log=hearing_log,
+        )
 
     # ----------------------------------
     # Full Evaluation → Structured Output
@@ -133,64 +210,131 @@ Mention confidence explicitly.
         prosecutor_argument: str,
         defense_argument: str,
         evidence_list: List[Dict],
-        hearing_log: List[Dict]
+        hearing_log: List[Dict],
+        case_id: str = DEFAULT_CASE_ID
     ) -> JudgementModel:
 
-        scores = self._score_arguments(
-            prosecutor_argument,
-            defense_argument,
-            evidence_list,
-            case
-        )
+        with span("judge.evaluate", debate_id=debate_id):
+            with span("judge.score", debate_id=debate_id):
+                scores = self._score_arguments(
+                    prosecutor_argument,
+                    defense_argument,
+                    evidence_list,
+                    case
+                )
+                final_score, prosecution_score, defense_score, verdict = self._decide(scores)
 
-        # Weighted Final Score
-        final_score = (
-            scores["evidence_strength"] * 0.35 +
-            scores["legal_application"] * 0.25 +
-            scores["consistency"] * 0.15 +
-            scores["credibility"] * 0.25 -
-            scores["defense_effectiveness"] * 0.2
-        )
+            confidence = round(final_score, 2)
+            reasoning = self.deliberate(
+                verdict,
+                case,
+                confidence,
+                prosecutor_argument,
+                defense_argument
+            )
 
-        # Weighted prosecution score
-        prosecution_score = (scores["evidence_strength"] + scores["legal_application"]) / 2
-        defense_score = scores["defense_effectiveness"]
-
-        # ----------------------------------
-        # Verdict Logic with thresholds
-        # ----------------------------------
-        if prosecution_score > defense_score:
-            verdict = "Violation Confirmed"
-        elif prosecution_score < defense_score:
-            verdict = "Violation Not Confirmed"
-        else:
-            verdict = "Benefit of doubt granted"
+            # Log judgement
+            log_judgement(
+                debate_id=debate_id,
+                scores=scores,
+                verdict=verdict,
+                rubric_version=self.rubric.version,
+            )
+
+            return self._build_judgement(
+                case, scores, prosecution_score, verdict, reasoning, evidence_list, hearing_log, case_id
+            )
 
+    def stream_evaluate(
+        self,
+        debate_id: str,
+        case: str,
+        prosecutor_argument: str,
+        defense_argument: str,
+        evidence_list: List[Dict],
+        hearing_log: List[Dict],
+        case_id: str = DEFAULT_CASE_ID
+    ):
+        """
+        Streaming variant of evaluate. Yields ("verdict", verdict) as soon
+        as the rubric is scored, then ("token", text) while the reasoning
+        is generated, and finally ("judgement", JudgementModel).
+        """
+        with span("judge.score", debate_id=debate_id):
+            scores = self._score_arguments(
+                prosecutor_argument,
+                defense_argument,
+                evidence_list,
+                case
+            )
+            final_score, prosecution_score, defense_score, verdict = self._decide(scores)
         confidence = round(final_score, 2)
-        reasoning = self.deliberate(
+        yield "verdict", verdict
+
+        parts = []
+        for token in self.stream_deliberate(
             verdict,
             case,
             confidence,
             prosecutor_argument,
             defense_argument
-        )
+        ):
+            parts.append(token)
+            yield "token", token
 
-        # Log judgement
         log_judgement(
             debate_id=debate_id,
             scores=scores,
             verdict=verdict,
+            rubric_version=self.rubric.version,
         )
 
-        return JudgementModel(
-            judgement_id=str(uuid.uuid4()),
-            case_id="AUTO-CASE",
-            verdict=verdict,
-            prosecution_score=round(prosecution_score, 2),
-            defense_score=round(scores["defense_effectiveness"], 2),
-            rubric_scores=scores,
-            reasoning=reasoning,
-            case_facts=case,
-            evidence_considered=evidence_list,
-            hearing_log=hearing_log,
+        yield "judgement", self._build_judgement(
+            case, scores, prosecution_score, verdict, "".join(parts), evidence_list, hearing_log, case_id
         )
+
+    async def aevaluate(
+        self,
+        debate_id: str,
+        case: str,
+        prosecutor_argument: str,
+        defense_argument: str,
+        evidence_list: List[Dict],
+        hearing_log: List[Dict],
+        case_id: str = DEFAULT_CASE_ID
+    ) -> JudgementModel:
+        """
+        Async variant of evaluate: the judgement is logged while the
+        deliberation LLM call is in flight.
+        """
+        with span("judge.evaluate", debate_id=debate_id):
+            with span("judge.score", debate_id=debate_id):
+                scores = self._score_arguments(
+                    prosecutor_argument,
+                    defense_argument,
+                    evidence_list,
+                    case
+                )
+                final_score, prosecution_score, defense_score, verdict = self._decide(scores)
+            confidence = round(final_score, 2)
+
+            reasoning, _ = await asyncio.gather(
+                self.adeliberate(
+                    verdict,
+                    case,
+                    confidence,
+                    prosecutor_argument,
+                    defense_argument
+                ),
+                asyncio.to_thread(
+                    log_judgement,
+                    debate_id=debate_id,
+                    scores=scores,
+                    verdict=verdict,
+                    rubric_version=self.rubric.version,
+                )
+            )
+
+            return self._build_judgement(
+                case, scores, prosecution_score, verdict, reasoning, evidence_list, hearing_log, case_id
+            )
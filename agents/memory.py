@@ -1,38 +1,121 @@
+import re
 from database.logger import log_memory
+from agents.prompt_budget import count_tokens, truncate_tokens
+
+
+def digest_turn(speaker: str, text: str, max_tokens: int = 40) -> str:
+    """
+    Extractive one-line digest of a turn: its first bullet or sentence.
+    """
+    lines = [line.strip(" -*\u2022\t") for line in text.splitlines()]
+    first = next((line for line in lines if line), "")
+    sentence = re.split(r"(?<=[.!?])\s", first, maxsplit=1)[0]
+    return f"{speaker}: {truncate_tokens(sentence, max_tokens)}"
 
 
 class MemoryManager:
     """
     Stores:
-    - last 5 debate turns
+    - last max_turns debate turns verbatim
+    - rolling summary of older turns: one digest per turn, made once when
+      the turn leaves the window (oldest digests dropped past summary_tokens)
     - case info
-    - long-term memory placeholder
+    summarizer(speaker, text) -> str replaces the extractive digest,
+    e.g. with an LLM call using summarize_prompt.
     """
 
-    def __init__(self, max_turns: int = 5):
+    def __init__(self, max_turns: int = 5, summarizer=None, summary_tokens: int = 200):
         self.case_summary = None
         self.turn_history = []
         self.max_turns = max_turns
+        self.summarizer = summarizer or digest_turn
+        self.summary_tokens = summary_tokens
+        self.summary = []
+        self._summary_costs = []
+        self._prompt_cache = {}
+        # Turns are numbered in the order added; digests of turns still in
+        # the verbatim window are kept here by number, not on the turns
+        self._turns_added = 0
+        self._digests = {}
 
     def set_case(self, case_text: str):
         self.case_summary = case_text
+        self._prompt_cache.clear()
 
     def add_turn(self, speaker: str, text: str, debate_id=None):
         self.turn_history.append({"speaker": speaker, "text": text})    
+        self._turns_added += 1
         if debate_id:
             log_memory(debate_id, speaker, text)
         if len(self.turn_history) > self.max_turns:
-            self.turn_history.pop(0)
+            number = self._turns_added - len(self.turn_history)
+            self._fold(number, self.turn_history.pop(0), self.summary, self._summary_costs)
+            self._digests.pop(number, None)
+        self._prompt_cache.clear()
+
+    def _digest(self, number, turn):
+        # Made once per turn, however many trimmed prompts fold it
+        entry = self._digests.get(number)
+        if entry is None:
+            digest = self.summarizer(turn["speaker"], turn["text"])
+            entry = self._digests[number] = (digest, count_tokens(digest))
+        return entry
 
-    def get_memory_prompt(self) -> str:
+    def _fold(self, number, turn, summary, costs):
         """
-        Converts memory into text for prompt injection.
+        Moves turn `number` out of the verbatim window into a rolling summary
+        (summary digests and their token costs, trimmed to summary_tokens).
         """
+        digest, cost = self._digest(number, turn)
+        summary.append(digest)
+        costs.append(cost)
+        while len(summary) > 1 and sum(costs) > self.summary_tokens:
+            summary.pop(0)
+            costs.pop(0)
+
+    def _render(self, include_case: bool, turn_history, summary, latest_text: str = None) -> str:
+        turns = [(t["speaker"], t["text"]) for t in turn_history]
+        if latest_text is not None and turns:
+            turns[-1] = (turns[-1][0], latest_text)
         memory_text = "\n".join(
-            [f"{t['speaker']}: {t['text']}" for t in self.turn_history]
+            [f"{speaker}: {text}" for speaker, text in turns]
         )
+        parts = []
+        if include_case:
+            parts.append(f"CASE SUMMARY:\n{self.case_summary}\n\n")
+        if summary:
+            parts.append("EARLIER DEBATE (summary):\n" + "\n".join(f"- {d}" for d in summary) + "\n\n")
+        parts.append(f"RECENT DEBATE MEMORY:\n{memory_text}\n")
+        return "".join(parts)
+
+    def get_memory_prompt(self, max_tokens: int = None, include_case: bool = True) -> str:
+        """
+        Converts memory into text for prompt injection.
+        With max_tokens, the oldest verbatim turns are folded into the
+        rolling summary of the returned text until it fits (the latest turn
+        is kept); the stored memory itself is left unchanged.
+        """
+        key = (max_tokens, include_case)
+        if key in self._prompt_cache:
+            return self._prompt_cache[key]
+
+        turns, summary = self.turn_history, self.summary
+        text = self._render(include_case, turns, summary)
+        if max_tokens is not None:
+            # Trim copies, so a tight budget for one prompt does not
+            # shrink the memory every later prompt sees
+            turns, summary, costs = list(turns), list(summary), list(self._summary_costs)
+            number = self._turns_added - len(turns)
+            while count_tokens(text) > max_tokens and len(turns) > 1:
+                self._fold(number, turns.pop(0), summary, costs)
+                number += 1
+                text = self._render(include_case, turns, summary)
+            if count_tokens(text) > max_tokens and turns:
+                # Only the latest turn is left verbatim: shorten it, keep the rest
+                room = max_tokens - count_tokens(self._render(include_case, turns, summary, latest_text=""))
+                text = self._render(
+                    include_case, turns, summary, latest_text=truncate_tokens(turns[-1]["text"], max(room - 1, 0))
+                )
 
-        return (
-            f"CASE SUMMARY:\n{self.case_summary}\n\n"
-            f"RECENT DEBATE MEMORY:\n{memory_text}\n"
-        )
\ No newline at end of file
+        self._prompt_cache[key] = text
+        return text
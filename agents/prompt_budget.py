@@ -0,0 +1,123 @@
+"""
+Token counting and per-role budgets for agent prompts.
+
+Counts use tiktoken when it is installed and its encoding can be loaded;
+otherwise a ~4 characters per token estimate, so budgets still hold offline.
+"""
+import threading
+from functools import lru_cache
+from database.tracing import estimate_tokens
+
+try:
+    import tiktoken
+except ImportError:  # budgets fall back to the character estimate
+    tiktoken = None
+
+ENCODING_NAME = "cl100k_base"
+
+_encoding = None
+_encoding_lock = threading.Lock()
+_encoding_failed = False
+
+
+def _get_encoding():
+    global _encoding, _encoding_failed
+    if _encoding is None and tiktoken is not None and not _encoding_failed:
+        with _encoding_lock:
+            if _encoding is None and not _encoding_failed:
+                try:
+                    _encoding = tiktoken.get_encoding(ENCODING_NAME)
+                except Exception:
+                    # The encoding file is fetched on first use; offline boxes estimate
+                    _encoding_failed = True
+    return _encoding
+
+
+@lru_cache(maxsize=4096)
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int, keep: str = "head") -> str:
+    """
+    Cuts text to at most max_tokens, keeping the start (keep="head") or
+    the end (keep="tail"). An ellipsis marks the cut.
+    """
+    if not text or count_tokens(text) <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ""
+
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        if keep == "tail":
+            return "…" + encoding.decode(tokens[-max_tokens:])
+        return encoding.decode(tokens[:max_tokens]) + "…"
+
+    chars = max_tokens * 4
+    if keep == "tail":
+        return "…" + text[-chars:]
+    return text[:chars] + "…"
+
+
+class PromptBudget:
+    """
+    Token caps for the variable sections of an argument prompt.
+    """
+
+    def __init__(
+        self,
+        case_tokens: int = 300,
+        memory_tokens: int = 400,
+        evidence_tokens: int = 500,
+        max_evidence_items: int = 8
+    ):
+        self.case_tokens = case_tokens
+        self.memory_tokens = memory_tokens
+        self.evidence_tokens = evidence_tokens
+        self.max_evidence_items = max_evidence_items
+
+    @property
+    def total_tokens(self) -> int:
+        return self.case_tokens + self.memory_tokens + self.evidence_tokens
+
+
+DEFAULT_BUDGET = PromptBudget()
+
+ROLE_BUDGETS = {
+    "Prosecutor": PromptBudget(),
+    "Defense Lawyer": PromptBudget(),
+}
+
+
+def get_budget(role: str) -> PromptBudget:
+    return ROLE_BUDGETS.get(role, DEFAULT_BUDGET)
+
+
+def select_evidence(evidence_list, max_tokens: int, max_items: int, render):
+    """
+    Highest-scoring evidence first, duplicate texts dropped,
+    added while render(evidence) still fits in max_tokens.
+    Returns the kept evidence in rank order.
+    """
+    ranked = sorted(evidence_list, key=lambda e: e.get("score", 0), reverse=True)
+    kept, seen, used = [], set(), 0
+    for e in ranked:
+        if len(kept) >= max_items:
+            break
+        key = " ".join(str(e.get("text", "")).split())
+        if key in seen:
+            continue
+        cost = count_tokens(render(e))
+        if used + cost > max_tokens:
+            continue
+        seen.add(key)
+        kept.append(e)
+        used += cost
+    return kept
@@ -1,5 +1,5 @@
 from .base_agent import BaseAgent
-from .argument_utils import build_argument_prompt, classify_argument_prompt, summarize_prompt
+from .argument_utils import build_argument_prompt, classify_argument_prompt, summarize_prompt, memory_prompt
 
 class ProsecutorAgent(BaseAgent):
 
@@ -8,7 +8,7 @@ class ProsecutorAgent(BaseAgent):
             role="Prosecutor",
             case=case,
             evidence_list=evidence_list,
-            memory_text=memory.get_memory_prompt()
+            memory_text=memory_prompt("Prosecutor", memory)
         )
         argument = self.generate(prompt)
         memory.add_turn("Prosecutor", argument)
@@ -19,3 +19,39 @@ class ProsecutorAgent(BaseAgent):
 
     def summarize(self, argument):
         return self.generate(summarize_prompt(argument))
+
+    def stream_argument(self, case, evidence_list, memory):
+        """
+        Yields the argument token by token.
+        """
+        prompt = build_argument_prompt(
+            role="Prosecutor",
+            case=case,
+            evidence_list=evidence_list,
+            memory_text=memory_prompt("Prosecutor", memory)
+        )
+        parts = []
+        for token in self.stream(prompt):
+            parts.append(token)
+            yield token
+        memory.add_turn("Prosecutor", "".join(parts))
+
+    # ----------------------------------
+    # Async variants
+    # ----------------------------------
+    async def agenerate_argument(self, case, evidence_list, memory):
+        prompt = build_argument_prompt(
+            role="Prosecutor",
+            case=case,
+            evidence_list=evidence_list,
+            memory_text=memory_prompt("Prosecutor", memory)
+        )
+        argument = await self.agenerate(prompt)
+        memory.add_turn("Prosecutor", argument)
+        return argument
+
+    async def aclassify(self, argument):
+        return await self.agenerate(classify_argument_prompt(argument))
+
+    async def asummarize(self, argument):
+        return await self.agenerate(summarize_prompt(argument))
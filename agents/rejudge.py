@@ -0,0 +1,308 @@
+"""
+Re-adjudication of archived hearings from the audit tables.
+
+    python -m agents.rejudge --out rejudged.jsonl
+    python -m agents.rejudge --since 2026-01-01 --workers 8
+    python -m agents.rejudge --rubric data/rubrics/experiment.json --out exp.jsonl
+    python -m agents.rejudge --deliberate --backend stub     # also regenerate reasoning
+
+Case facts, the final prosecutor/defense turns and the evidence each
+debate was argued on are read back from debates, agent_turns and
+debate_evidence; only the deterministic rubric scoring and verdict logic
+run again, in batches across a process pool. No LLM call is made unless
+--deliberate is given. Each row reports the stored and the new verdict.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Dict, Optional
+from rag.db import get_conn, init_db
+from database.logger import drain_logs, flush_logs, log_judgement
+from agents.rubric import Rubric, get_rubric
+
+PAGE_SIZE = 4000
+# Ids per IN (...) list, below SQLite's bound-parameter limit on older builds
+IN_BATCH = 900
+
+# Debates in start order, keyset-paginated on idx_debates_started
+HEARINGS_SQL = """
+SELECT id, case_id, case_facts, started_at
+FROM debates
+WHERE started_at >= ? AND started_at < ? AND (started_at, id) > (?, ?)
+ORDER BY started_at, id
+LIMIT ?
+"""
+
+_MIN_TS = ""
+_MAX_TS = "9999-12-31 23:59:59~"
+
+
+def _select_in(cur, sql, ids):
+    """
+    Rows of sql (with an {ids} placeholder) for all ids, IN_BATCH at a time.
+    """
+    rows = []
+    for start in range(0, len(ids), IN_BATCH):
+        part = ids[start:start + IN_BATCH]
+        cur.execute(sql.format(ids=",".join("?" * len(part))), part)
+        rows.extend(cur.fetchall())
+    return rows
+
+
+def _load_page(cur, rows) -> List[Dict]:
+    """
+    Turns, evidence and latest judgement for one page of debates,
+    with one query per table (per IN_BATCH debates).
+    """
+    ids = [row[0] for row in rows]
+    hearings = {
+        debate_id: {
+            "debate_id": debate_id,
+            "case_id": case_id,
+            "case_facts": case_facts,
+            "prosecutor": None,
+            "defense": None,
+            "evidence": [],
+            "old_verdict": None,
+            "old_scores": None,
+            "old_rubric_version": None,
+        }
+        for debate_id, case_id, case_facts, _ in rows
+    }
+
+    # Later turns overwrite earlier ones: evaluate judges the final round
+    for debate_id, agent, text in _select_in(
+        cur, "SELECT debate_id, agent, text FROM agent_turns WHERE debate_id IN ({ids}) ORDER BY debate_id, id", ids
+    ):
+        if agent in ("prosecutor", "defense"):
+            hearings[debate_id][agent] = text or ""
+
+    for debate_id, chunk_id, source, text, score, verified in _select_in(
+        cur,
+        """
+        SELECT debate_id, chunk_id, source, text, score, verified
+        FROM debate_evidence WHERE debate_id IN ({ids}) ORDER BY debate_id, id
+        """,
+        ids
+    ):
+        hearings[debate_id]["evidence"].append({
+            "chunk_id": chunk_id,
+            "source": source,
+            "text": text,
+            "score": score if score is not None else 0,
+            "verified": bool(verified),
+        })
+
+    for debate_id, verdict, scores_json, rubric_version in _select_in(
+        cur,
+        """
+        SELECT debate_id, verdict, scores_json, rubric_version FROM judgements
+        WHERE id IN (SELECT MAX(id) FROM judgements WHERE debate_id IN ({ids}) GROUP BY debate_id)
+        """,
+        ids
+    ):
+        hearings[debate_id]["old_verdict"] = verdict
+        hearings[debate_id]["old_scores"] = json.loads(scores_json) if scores_json else None
+        hearings[debate_id]["old_rubric_version"] = rubric_version
+
+    return [hearings[debate_id] for debate_id in ids]
+
+
+def load_hearings(since: str = None, until: str = None, page_size: int = PAGE_SIZE, conn=None):
+    """
+    Yields pages (lists) of archived hearings started in [since, until):
+    {debate_id, case_id, case_facts, prosecutor, defense, evidence,
+     old_verdict, old_scores, old_rubric_version}
+    """
+    drain_logs()
+    own_conn = conn is None
+    conn = conn or get_conn()
+    cur = conn.cursor()
+    after = (_MIN_TS, "")
+    try:
+        while True:
+            cur.execute(HEARINGS_SQL, (since or _MIN_TS, until or _MAX_TS, *after, page_size))
+            rows = cur.fetchall()
+            if not rows:
+                return
+            yield _load_page(cur, rows)
+            after = (rows[-1][3], rows[-1][0])
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def is_rejudgeable(hearing: Dict) -> bool:
+    """
+    Hearings logged before case facts were stored, or that never reached
+    both closing turns, cannot be scored as evaluate scored them.
+    """
+    return bool(hearing["case_facts"]) and hearing["prosecutor"] is not None and hearing["defense"] is not None
+
+
+# Rubrics compiled in this (worker) process, by version
+_compiled = {}
+
+
+def _score_chunk(spec, items):
+    # Runs in a worker process; compiled rubrics hold regexes and closures,
+    # so workers receive the spec and compile it once
+    rubric = _compiled.get(spec["name"], {}).get(spec["version"])
+    if rubric is None:
+        rubric = _compiled.setdefault(spec["name"], {})[spec["version"]] = Rubric(spec)
+    return rubric.score_batch(items)
+
+
+def rescore(hearings: List[Dict], rubric: Rubric, pool: ProcessPoolExecutor = None, chunk_size: int = 500) -> List[Dict]:
+    """
+    Rubric scores and verdicts for rejudgeable hearings, in input order.
+    Without a pool (or for a single chunk) scoring runs in this process.
+    """
+    items = [(h["case_facts"], h["prosecutor"], h["defense"], h["evidence"]) for h in hearings]
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    if pool is None or len(chunks) <= 1:
+        scored = [rubric.score_batch(chunk) for chunk in chunks]
+    else:
+        scored = list(pool.map(_score_chunk, [rubric.spec] * len(chunks), chunks))
+    return [result for chunk in scored for result in chunk]
+
+
+def rejudge(
+    since: str = None,
+    until: str = None,
+    output_path: Optional[str] = None,
+    workers: int = None,
+    deliberate: bool = False,
+    llm=None,
+    concurrency: int = 8,
+    record: bool = False,
+    rubric=None,
+    log=print
+) -> Dict:
+    """
+    Re-scores every archived hearing in [since, until) and returns stats:
+    hearings, rejudged, skipped, changed (verdicts differing from the
+    stored ones), verdicts, seconds, hearings_per_second.
+    - output_path: one JSONL row per hearing with old and new verdict
+    - deliberate: regenerate the judge's reasoning with llm (threads, `concurrency` at a time)
+    - record: log the new judgements to the judgements table
+    - rubric: rubric name, spec path or Rubric (default: COURTROOM_RUBRIC / "default")
+    """
+    # Fresh databases get their tables, older ones the rubric_version column read below
+    init_db()
+    rubric = get_rubric(rubric)
+    judge = None
+    if deliberate:
+        from agents.judge import JudgeAgent
+        judge = JudgeAgent(llm=llm, rubric=rubric)
+
+    stats = {"rubric_version": rubric.version, "hearings": 0, "rejudged": 0, "skipped": 0, "changed": 0, "verdicts": {}}
+    started = time.perf_counter()
+    out = open(output_path, "w", encoding="utf-8") if output_path else None
+    threads = ThreadPoolExecutor(max_workers=concurrency) if deliberate else None
+    pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count()) if workers != 0 else None
+
+    try:
+        for page in load_hearings(since, until):
+            stats["hearings"] += len(page)
+            ready = [h for h in page if is_rejudgeable(h)]
+            stats["skipped"] += len(page) - len(ready)
+            results = rescore(ready, rubric, pool)
+
+            reasoning = [None] * len(ready)
+            if deliberate:
+                reasoning = list(threads.map(
+                    lambda pair: judge.deliberate(
+                        pair[1]["verdict"],
+                        pair[0]["case_facts"],
+                        round(pair[1]["final_score"], 2),
+                        pair[0]["prosecutor"],
+                        pair[0]["defense"],
+                    ),
+                    zip(ready, results)
+                ))
+
+            for hearing, result, text in zip(ready, results, reasoning):
+                changed = hearing["old_verdict"] is not None and hearing["old_verdict"] != result["verdict"]
+                stats["rejudged"] += 1
+                stats["changed"] += changed
+                stats["verdicts"][result["verdict"]] = stats["verdicts"].get(result["verdict"], 0) + 1
+
+                if record:
+                    log_judgement(
+                        debate_id=hearing["debate_id"],
+                        scores=result["scores"],
+                        verdict=result["verdict"],
+                        rubric_version=rubric.version,
+                    )
+                if out:
+                    row = {
+                        "debate_id": hearing["debate_id"],
+                        "case_id": hearing["case_id"],
+                        "old_verdict": hearing["old_verdict"],
+                        "verdict": result["verdict"],
+                        "changed": changed,
+                        "confidence": round(result["final_score"], 2),
+                        "scores": result["scores"],
+                        "old_scores": hearing["old_scores"],
+                        "rubric_version": rubric.version,
+                        "old_rubric_version": hearing["old_rubric_version"],
+                    }
+                    if deliberate:
+                        row["reasoning"] = text
+                    out.write(json.dumps(row) + "\n")
+
+            log(f"  {stats['rejudged']} rejudged, {stats['skipped']} skipped, {stats['changed']} verdicts changed")
+    finally:
+        if out:
+            out.close()
+        if threads:
+            threads.shutdown()
+        if pool:
+            pool.shutdown()
+        if record:
+            flush_logs()
+
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = round(elapsed, 2)
+    stats["hearings_per_second"] = round(stats["rejudged"] / elapsed, 1) if elapsed else 0.0
+    return stats
+
+
+def main(argv=None):
+    from llm_backends import get_llm_backend, llm_backend_names
+
+    parser = argparse.ArgumentParser(description="Re-score archived hearings without re-running the debate.")
+    parser.add_argument("--since", default=None, help="only debates started at or after this 'YYYY-MM-DD HH:MM:SS'")
+    parser.add_argument("--until", default=None, help="only debates started before this")
+    parser.add_argument("--out", default=None, help="JSONL with old and new verdict per hearing")
+    parser.add_argument("--workers", type=int, default=None, help="scoring processes (default: CPU count, 0 = inline)")
+    parser.add_argument("--deliberate", action="store_true", help="regenerate reasoning with the LLM")
+    parser.add_argument("--backend", choices=llm_backend_names(), default=None,
+                        help="LLM backend for --deliberate (default: COURTROOM_LLM_BACKEND or openrouter)")
+    parser.add_argument("--concurrency", type=int, default=8, help="deliberation calls in flight")
+    parser.add_argument("--rubric", default=None, help="rubric name in data/rubrics or spec path (default: COURTROOM_RUBRIC or default)")
+    parser.add_argument("--record", action="store_true", help="log the new judgements to the judgements table")
+    args = parser.parse_args(argv)
+
+    stats = rejudge(
+        since=args.since,
+        until=args.until,
+        output_path=args.out,
+        workers=args.workers,
+        deliberate=args.deliberate,
+        llm=get_llm_backend(args.backend) if args.deliberate else None,
+        concurrency=args.concurrency,
+        record=args.record,
+        rubric=args.rubric,
+        log=lambda msg: print(msg, file=sys.stderr),
+    )
+    print(json.dumps(stats))
+    return stats
+
+
+if __name__ == "__main__":
+    main()
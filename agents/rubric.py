@@ -0,0 +1,244 @@
+"""
+Judge rubrics: declarative JSON specs compiled into scoring plans.
+
+    rubric = get_rubric("default")          # data/rubrics/default.json
+    scores = rubric.score(case, prosecutor_text, defense_text, evidence)
+    final_score, prosecution_score, defense_score, verdict = rubric.decide(scores)
+    scored = rubric.score_batch([(case, prosecutor_text, defense_text, evidence), ...])
+
+A spec lists the rubric dimensions, their keyword lists and bonuses, the
+weights of the final score and the verdict rule (see data/rubrics/default.json).
+Each spec is loaded and compiled once per process: keyword lists become one
+regex per dimension. Every judgement records the rubric's version.
+
+score_batch is score/decide applied hearing by hearing (see
+tests/test_rubric.py), reusing case-fact word sets across hearings of the
+same case. It exists so re-judging can hand a process-pool worker one
+chunk of hearings per call; it is no faster than scoring one at a time.
+"""
+import os
+import re
+import json
+import threading
+
+# Bare rubric names resolve here whatever the working directory
+RUBRIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "rubrics")
+DEFAULT_RUBRIC = "default"
+
+DIMENSION_TYPES = ("evidence_sum", "keywords", "fact_overlap", "verified_evidence")
+KEYWORD_TEXTS = ("prosecutor", "defense")
+
+
+def keyword_matcher(keywords):
+    """
+    One regex matching any of the keywords as a substring,
+    i.e. matcher.search(text) == any(k in text for k in keywords).
+    """
+    # Longest first, so a keyword is never shadowed by one of its prefixes
+    ordered = sorted(set(keywords), key=len, reverse=True)
+    return re.compile("|".join(re.escape(k) for k in ordered))
+
+
+def _capped(value, cap):
+    return min(value, cap) if cap is not None else value
+
+
+def _compile_dimension(spec):
+    """
+    fn(row) -> raw score for one dimension, where row holds the lowered
+    texts, the evidence and the case/argument word sets.
+    """
+    kind = spec.get("type")
+    cap = spec.get("cap")
+
+    if kind == "evidence_sum":
+        scale = spec.get("scale", 100)
+        return lambda row: _capped(sum(e.get("score", 0) for e in row["evidence"]) * scale, cap)
+
+    if kind == "keywords":
+        if spec.get("text") not in KEYWORD_TEXTS:
+            raise ValueError(f"Dimension '{spec['name']}': text must be one of {KEYWORD_TEXTS}")
+        matcher = keyword_matcher(spec["keywords"])
+        text, hit, miss = spec["text"], spec["base"] + spec["bonus"], spec["base"]
+        hit, miss = _capped(hit, cap), _capped(miss, cap)
+        return lambda row: hit if matcher.search(row[text]) else miss
+
+    if kind == "fact_overlap":
+        scale, default = spec.get("scale", 100), spec.get("default", 50)
+
+        def overlap(row):
+            case_words = row["case_words"]
+            if not case_words:
+                return default
+            return _capped((len(case_words & row["said_words"]) / len(case_words)) * scale, cap)
+        return overlap
+
+    if kind == "verified_evidence":
+        hit, miss = _capped(spec["base"] + spec["bonus"], cap), _capped(spec["base"], cap)
+        return lambda row: hit if row["evidence"] and any(e.get("verified", False) for e in row["evidence"]) else miss
+
+    raise ValueError(f"Dimension '{spec.get('name')}': unknown type '{kind}', expected one of {DIMENSION_TYPES}")
+
+
+class Rubric:
+    """
+    A compiled rubric spec. Scores are plain dicts keyed by dimension name,
+    in spec order; the arithmetic matches the original hard-coded rubric
+    operation for operation, so results are reproducible across versions.
+    """
+
+    def __init__(self, spec: dict):
+        self.spec = spec
+        self.name = spec["name"]
+        self.version = f"{spec['name']}@{spec['version']}"
+        self.precision = spec.get("precision", 2)
+        self.dimensions = tuple(d["name"] for d in spec["dimensions"])
+        self._scorers = [_compile_dimension(d) for d in spec["dimensions"]]
+        self._needs_words = any(d["type"] == "fact_overlap" for d in spec["dimensions"])
+
+        unknown = set(spec["weights"]) - set(self.dimensions)
+        verdict = spec["verdict"]
+        unknown |= (set(verdict["prosecution"]) | set(verdict["defense"])) - set(self.dimensions)
+        if unknown:
+            raise ValueError(f"Rubric '{self.name}' refers to unknown dimensions {sorted(unknown)}")
+
+        # Weighted terms are summed in spec order, like the original formula
+        self.weight_columns = [self.dimensions.index(d) for d in spec["weights"]]
+        self.weights = tuple(float(w) for w in spec["weights"].values())
+        self._prosecution = [self.dimensions.index(d) for d in verdict["prosecution"]]
+        self._defense = [self.dimensions.index(d) for d in verdict["defense"]]
+        labels = verdict["labels"]
+        self.verdicts = (labels["prosecution"], labels["defense"], labels["tie"])
+
+    def __repr__(self):
+        return f"Rubric({self.version!r})"
+
+    # ----------------------------------
+    # Scoring
+    # ----------------------------------
+    def _row(self, case_words, prosecutor_text, defense_text, evidence):
+        row = {
+            "prosecutor": prosecutor_text.lower(),
+            "defense": defense_text.lower(),
+            "evidence": evidence or [],
+            "case_words": case_words,
+        }
+        if self._needs_words and case_words:
+            said = set(row["prosecutor"].split())
+            said.update(row["defense"].split())
+            row["said_words"] = said
+        return tuple(round(scorer(row), self.precision) for scorer in self._scorers)
+
+    def score(self, case_facts: str, prosecutor_text: str, defense_text: str, evidence) -> dict:
+        case_words = set(case_facts.lower().split()) if self._needs_words else None
+        return dict(zip(self.dimensions, self._row(case_words, prosecutor_text, defense_text, evidence)))
+
+    # ----------------------------------
+    # Verdict
+    # ----------------------------------
+    @staticmethod
+    def _combine(values):
+        # A single dimension is used as is; several are averaged
+        if len(values) == 1:
+            return values[0]
+        total = values[0]
+        for value in values[1:]:
+            total = total + value
+        return total / len(values)
+
+    def decide(self, scores: dict):
+        """
+        Returns (final_score, prosecution_score, defense_score, verdict).
+        """
+        values = [scores[d] for d in self.dimensions]
+        final_score = None
+        for column, weight in zip(self.weight_columns, self.weights):
+            term = values[column] * weight
+            final_score = term if final_score is None else final_score + term
+
+        prosecution_score = self._combine([values[i] for i in self._prosecution])
+        defense_score = self._combine([values[i] for i in self._defense])
+        if prosecution_score > defense_score:
+            verdict = self.verdicts[0]
+        elif prosecution_score < defense_score:
+            verdict = self.verdicts[1]
+        else:
+            verdict = self.verdicts[2]
+        return final_score, prosecution_score, defense_score, verdict
+
+    def score_batch(self, items):
+        """
+        Scores and verdicts for many (case_facts, prosecutor_text,
+        defense_text, evidence) tuples:
+        [{"scores", "final_score", "prosecution_score", "defense_score", "verdict"}, ...]
+        """
+        case_words_cache = {}
+        results = []
+        for case_facts, prosecutor_text, defense_text, evidence in items:
+            case_words = None
+            if self._needs_words:
+                case_words = case_words_cache.get(case_facts)
+                if case_words is None:
+                    case_words = case_words_cache[case_facts] = set(case_facts.lower().split())
+            scores = dict(zip(self.dimensions, self._row(case_words, prosecutor_text, defense_text, evidence)))
+            final_score, prosecution_score, defense_score, verdict = self.decide(scores)
+            results.append({
+                "scores": scores,
+                "final_score": final_score,
+                "prosecution_score": prosecution_score,
+                "defense_score": defense_score,
+                "verdict": verdict,
+            })
+        return results
+
+# ----------------------------------
+# Loading
+# ----------------------------------
+_rubrics = {}
+_rubrics_lock = threading.Lock()
+
+
+def rubric_path(name: str) -> str:
+    """
+    A spec path as given, or data/rubrics/<name>.json for a bare name.
+    """
+    if name.endswith(".json") or os.sep in name:
+        return name
+    return os.path.join(RUBRIC_DIR, f"{name}.json")
+
+
+def load_rubric(path: str) -> Rubric:
+    with open(path, encoding="utf-8") as f:
+        return Rubric(json.load(f))
+
+
+def register_rubric(rubric: Rubric, key: str = None):
+    """
+    Makes a rubric (e.g. built from an in-memory spec) available to get_rubric.
+    """
+    with _rubrics_lock:
+        _rubrics[key or rubric.name] = rubric
+    return rubric
+
+
+def get_rubric(rubric=None) -> Rubric:
+    """
+    The compiled rubric for a Rubric, a name or a spec path; None means
+    COURTROOM_RUBRIC (default "default"). Specs are compiled once per process.
+    """
+    if isinstance(rubric, Rubric):
+        return rubric
+    key = rubric or os.getenv("COURTROOM_RUBRIC", DEFAULT_RUBRIC)
+    if key not in _rubrics:
+        with _rubrics_lock:
+            if key not in _rubrics:
+                _rubrics[key] = load_rubric(rubric_path(key))
+    return _rubrics[key]
+
+
+def score_batch(items, rubric=None):
+    """
+    Scores and verdicts for many (case_facts, prosecutor_text, defense_text,
+    evidence) tuples with one rubric.
+    """
+    return get_rubric(rubric).score_batch(items)
@@ -0,0 +1,338 @@
+"""
+End-to-end benchmarks on synthetic data, fully offline.
+
+    python -m benchmarks.run                                # 1k, 10k, 100k chunks
+    python -m benchmarks.run --sizes 1000,1000000 --dim 128 --out bench.json
+    python -m benchmarks.run --compare baseline.json        # exit 1 on regressions
+
+Runs against a throwaway SQLite database with the "stub" LLM backend and
+the "hashing" embedder, so timings cover this repo's code, not the network.
+Results are JSON: one row per (benchmark, size) with latency percentiles.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, int(round(q / 100 * (len(sorted_values) - 1)))))
+    return sorted_values[k]
+
+
+def measure(fn, repeat=20, warmup=2, per_call=1):
+    """
+    Times fn() `repeat` times after `warmup` untimed calls.
+    per_call is the number of operations one fn() performs; the result
+    is reported per operation.
+    """
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000 / per_call)
+    samples.sort()
+    return {
+        "n": repeat * per_call,
+        "mean_ms": round(sum(samples) / len(samples), 4),
+        "p50_ms": round(_percentile(samples, 50), 4),
+        "p95_ms": round(_percentile(samples, 95), 4),
+        "max_ms": round(samples[-1], 4),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# ----------------------------------
+# Benchmarks
+# ----------------------------------
+def bench_ingest(n_docs, log):
+    from rag.chunker import ingest_documents
+    from benchmarks.synthetic import kb_documents
+
+    stats = ingest_documents(kb_documents(n_docs, seed=1), batch_size=64, embed_workers=2)
+    log(f"  ingest: {stats['inserted']} chunks in {stats['total_seconds']}s")
+    return {
+        "name": "ingest",
+        "size": stats["chunks"],
+        "seconds": stats["total_seconds"],
+        "chunks_per_sec": round(stats["chunks"] / stats["total_seconds"], 1) if stats["total_seconds"] else 0.0,
+        "embed_per_sec": stats["embed_per_sec"],
+        "write_per_sec": stats["write_per_sec"],
+    }
+
+
+def bench_retrieval(size, dim, queries, repeat, index_dir, log):
+    from rag.db import get_conn
+    from rag.retriever import retrieve, retrieve_many
+    from rag.embedder import embed
+    from rag.vector_store import get_vector_store
+    from rag.index import build_index, get_kb_index
+    from database.logger import flush_logs
+    from benchmarks.synthetic import fill_chunks
+
+    start = time.perf_counter()
+    fill_chunks(size, dim, seed=2)
+    log(f"  {size} chunks ready in {time.perf_counter() - start:.1f}s")
+    results = []
+
+    store = get_vector_store()
+    start = time.perf_counter()
+    store.refresh(get_conn())
+    results.append({"name": "vector_store.refresh", "size": size, "seconds": round(time.perf_counter() - start, 4)})
+
+    it = iter(range(10 ** 9))
+    results.append({"name": "retrieve", "size": size, **measure(lambda: retrieve(queries[next(it) % len(queries)], 5), repeat)})
+    flush_logs()
+
+    batch = queries[:10]
+    results.append({"name": "retrieve_many[10]", "size": size, **measure(
+        lambda: retrieve_many(batch, 5), repeat, per_call=len(batch)
+    )})
+    flush_logs()
+
+    embedded = [embed(q) for q in queries]
+    results.append({"name": "vector_store.search", "size": size, **measure(
+        lambda: store.search(embedded[next(it) % len(embedded)], 5), repeat
+    )})
+
+    start = time.perf_counter()
+    build_index("flat", index_dir)
+    results.append({"name": "build_index[flat]", "size": size, "seconds": round(time.perf_counter() - start, 4)})
+    index = get_kb_index(index_dir=index_dir)
+    results.append({"name": "kb_index.search[flat]", "size": size, **measure(
+        lambda: index.search(embedded[next(it) % len(embedded)], 5), repeat
+    )})
+    return results
+
+
+def bench_judge(repeat):
+    from agents.judge import JudgeAgent
+    from benchmarks.synthetic import arguments
+
+    judge = JudgeAgent(llm=None)
+    samples = arguments(200, seed=3)
+
+    def score_all():
+        for prosecutor_text, defense_text, evidence, facts in samples:
+            judge._score_arguments(prosecutor_text, defense_text, evidence, facts)
+
+    return [{"name": "judge._score_arguments", "size": len(samples), **measure(score_all, repeat, per_call=len(samples))}]
+
+
+def bench_prompts(repeat):
+    from agents.argument_utils import build_argument_prompt, PromptPrefixCache, bind_prefix_cache
+    from agents.memory import MemoryManager
+    from benchmarks.synthetic import arguments
+
+    samples = arguments(200, seed=4)
+    memory = MemoryManager(max_turns=5)
+    for prosecutor_text, defense_text, _, _ in samples[:5]:
+        memory.add_turn("Prosecutor", prosecutor_text)
+        memory.add_turn("Defense", defense_text)
+
+    def build_all():
+        for _, _, evidence, facts in samples:
+            build_argument_prompt("Prosecutor", facts, evidence, memory.get_memory_prompt())
+
+    _, _, evidence, facts = samples[0]
+
+    def build_hearing():
+        # One hearing's turns: the shared prefix is built once, then reused
+        with bind_prefix_cache(PromptPrefixCache()):
+            for _ in range(len(samples)):
+                build_argument_prompt("Prosecutor", facts, evidence, memory.get_memory_prompt())
+
+    return [
+        {"name": "build_argument_prompt", "size": len(samples), **measure(build_all, repeat, per_call=len(samples))},
+        {"name": "build_argument_prompt[shared_prefix]", "size": len(samples), **measure(build_hearing, repeat, per_call=len(samples))},
+    ]
+
+
+def bench_hearings(n_cases, repeat, evidence):
+    from llm_backends import StubLLM
+    from agents.debate_pipeline import DebatePipeline
+    from database.logger import flush_logs
+    from benchmarks.synthetic import cases
+
+    stub = StubLLM(latency=0)
+    facts = [c["facts"] for c in cases(n_cases, seed=5)]
+    results = []
+    for rounds in (1, 3):
+        counter = iter(range(10 ** 9))
+
+        def hearing():
+            i = next(counter)
+            pipeline = DebatePipeline(llm=stub, debate_id=f"bench-{rounds}-{i}")
+            for ev in evidence:
+                pipeline.submit_evidence(ev)
+            pipeline.run(facts[i % len(facts)], rounds=rounds)
+
+        results.append({"name": f"hearing[rounds={rounds}]", "size": n_cases, **measure(hearing, repeat)})
+        flush_logs()
+    return results
+
+
+def bench_logging(n_entries):
+    from database.logger import audit_writer, log_agent_turn, flush_logs
+
+    flush_logs()
+    written = audit_writer.stats["written"]
+    start = time.perf_counter()
+    for i in range(n_entries):
+        log_agent_turn("bench-logging", "prosecutor", f"turn {i}")
+    submit_seconds = time.perf_counter() - start
+    flush_logs()
+    total_seconds = time.perf_counter() - start
+    return [{
+        "name": "log_agent_turn",
+        "size": n_entries,
+        "submit_us_per_entry": round(submit_seconds / n_entries * 1e6, 3),
+        "seconds_until_written": round(total_seconds, 4),
+        "entries_per_sec": round(n_entries / total_seconds, 1),
+        "written": audit_writer.stats["written"] - written,
+    }]
+
+
+# ----------------------------------
+# Runner
+# ----------------------------------
+def run(sizes, dim=384, ingest_docs=50, repeat=20, workdir=None, log=print):
+    """
+    Runs every benchmark and returns {"meta": ..., "results": [...]}.
+    """
+    # Offline stand-ins; set before the registries create their instances
+    os.environ["COURTROOM_EMBED_BACKEND"] = "hashing"
+    os.environ["COURTROOM_EMBED_DIM"] = str(dim)
+    os.environ["COURTROOM_EMBED_CACHE"] = "0"
+    os.environ["COURTROOM_LLM_BACKEND"] = "stub"
+
+    import rag.db
+    owns_workdir = workdir is None
+    workdir = workdir or tempfile.mkdtemp(prefix="courtroom-bench-")
+    rag.db.DB_PATH = os.path.join(workdir, "bench.db")
+    rag.db.init_db()
+
+    results = []
+    try:
+        log(f"ingest ({ingest_docs} synthetic documents)")
+        results.append(bench_ingest(ingest_docs, log))
+
+        from rag.retriever import retrieve
+        from benchmarks.synthetic import cases
+        queries = [c["facts"] for c in cases(50, seed=6)]
+
+        for size in sorted(sizes):
+            log(f"retrieval @ {size} chunks")
+            results.extend(bench_retrieval(size, dim, queries, repeat, os.path.join(workdir, "kb_index"), log))
+
+        log("judge scoring, prompt building")
+        results.extend(bench_judge(repeat))
+        results.extend(bench_prompts(repeat))
+
+        log("hearings (stub LLM)")
+        results.extend(bench_hearings(50, repeat, retrieve(queries[0], 5)))
+
+        log("audit logging")
+        results.extend(bench_logging(5000))
+    finally:
+        rag.db.close_thread_connections()
+        if owns_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    import numpy
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "numpy": numpy.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "sizes": sorted(sizes),
+            "dim": dim,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold=0.2):
+    """
+    Rows whose p50_ms (or seconds) grew by more than `threshold` (fractional)
+    against the baseline: [(name, size, old, new, ratio), ...]
+    """
+    def keyed(report):
+        return {(r["name"], r["size"]): r for r in report["results"]}
+
+    old_rows = keyed(baseline)
+    regressions = []
+    for key, row in keyed(current).items():
+        old = old_rows.get(key)
+        if old is None:
+            continue
+        metric = "p50_ms" if "p50_ms" in row else "seconds" if "seconds" in row else None
+        if metric is None or not old.get(metric):
+            continue
+        ratio = row[metric] / old[metric]
+        if ratio > 1 + threshold:
+            regressions.append((key[0], key[1], old[metric], row[metric], round(ratio, 2)))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark retrieval, hearings, judging and logging offline.")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma-separated chunk counts")
+    parser.add_argument("--dim", type=int, default=384, help="embedding dimension")
+    parser.add_argument("--ingest-docs", type=int, default=50, help="synthetic documents for the ingestion run")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--workdir", default=None, help="keep the benchmark database here")
+    parser.add_argument("--out", default=None, help="write results JSON to this file")
+    parser.add_argument("--compare", default=None, help="baseline results JSON")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown vs baseline (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    report = run(
+        [int(s) for s in args.sizes.split(",") if s],
+        dim=args.dim,
+        ingest_docs=args.ingest_docs,
+        repeat=args.repeat,
+        workdir=args.workdir,
+        log=lambda msg: print(msg, file=sys.stderr),
+    )
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for name, size, old, new, ratio in regressions:
+            print(f"REGRESSION {name} @ {size}: {old} -> {new} ({ratio}x)", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+    return report
+
+
+if __name__ == "__main__":
+    main()
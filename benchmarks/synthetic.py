@@ -0,0 +1,118 @@
+"""
+Synthetic traffic-law knowledge bases and case sets for benchmarks.
+Everything is generated from a seed, so runs are reproducible.
+"""
+import random
+import numpy as np
+from rag.db import get_conn, encode_embedding, chunk_hash
+
+_SUBJECTS = (
+    "the driver", "a motorcyclist", "the vehicle owner", "a rickshaw driver",
+    "the transport company", "a learner driver", "the bus conductor", "a pedestrian",
+)
+_ACTIONS = (
+    "exceeded the posted speed limit", "ran a red signal", "parked at a bus stop",
+    "drove without a valid licence", "used a mobile phone while driving",
+    "failed to wear a helmet", "overloaded the vehicle", "drove against one-way traffic",
+    "did not carry registration papers", "refused to stop for a traffic warden",
+)
+_RULES = (
+    "Section {n} of the Motor Vehicles Ordinance prescribes a fine of PKR {fine}.",
+    "Under rule {n}, the traffic warden may issue a ticket of PKR {fine}.",
+    "The offence is compoundable on payment of PKR {fine} within {days} days.",
+    "Repeat offences under section {n} may lead to suspension of the licence.",
+    "The penalty under rule {n} doubles if the violation endangers pedestrians.",
+    "An appeal against a ticket under section {n} lies within {days} days.",
+)
+_PLACES = (
+    "on the motorway", "near a school zone", "at a busy intersection",
+    "on a residential street", "outside the hospital", "on the ring road",
+)
+
+
+def law_sentence(rng: random.Random) -> str:
+    return rng.choice(_RULES).format(
+        n=rng.randint(10, 250), fine=rng.choice((200, 500, 750, 1000, 1500, 2000, 3000)), days=rng.choice((7, 15, 30))
+    )
+
+
+def kb_documents(n_docs: int, sentences_per_doc: int = 40, seed: int = 0):
+    """
+    [(source, text), ...] shaped like the files in data/kb.
+    """
+    rng = random.Random(seed)
+    return [
+        (f"synthetic_{i:05d}.txt", " ".join(law_sentence(rng) for _ in range(sentences_per_doc)))
+        for i in range(n_docs)
+    ]
+
+
+def fill_chunks(target: int, dim: int, seed: int = 0, batch: int = 10000) -> int:
+    """
+    Grows the chunks table to `target` rows of unique synthetic text with
+    random unit embeddings, bypassing the embedder (for large sizes).
+    Returns the number of rows inserted.
+    """
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute("SELECT COUNT(*) FROM chunks")
+    start = cur.fetchone()[0]
+    rng = random.Random(seed + start)
+    np_rng = np.random.default_rng(seed + start)
+
+    for lo in range(start, target, batch):
+        hi = min(target, lo + batch)
+        vectors = np_rng.standard_normal((hi - lo, dim), dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        rows = []
+        for i, vec in zip(range(lo, hi), vectors):
+            text = f"[{i}] {law_sentence(rng)} {law_sentence(rng)}"
+            rows.append((f"synthetic_{i // 100:05d}.txt", text, *encode_embedding(vec), chunk_hash(text)))
+        cur.executemany(
+            "INSERT INTO chunks (source, text, embedding_blob, embedding_dim, embedding_dtype, chunk_hash) VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        conn.commit()
+    conn.close()
+    return max(0, target - start)
+
+
+def cases(n: int, seed: int = 0):
+    """
+    [{case_id, facts}, ...] in the batch runner's case format.
+    """
+    rng = random.Random(seed)
+    return [
+        {
+            "case_id": f"synthetic-{i}",
+            "facts": (
+                f"{rng.choice(_SUBJECTS).capitalize()} {rng.choice(_ACTIONS)} {rng.choice(_PLACES)}. "
+                f"The incident was recorded at {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d} "
+                f"and {rng.choice(('a warden', 'a speed camera', 'a bystander', 'CCTV'))} reported it."
+            ),
+        }
+        for i in range(n)
+    ]
+
+
+def arguments(n: int, seed: int = 0):
+    """
+    [(prosecutor_text, defense_text, evidence), ...] for judge scoring.
+    """
+    from llm_backends import StubLLM
+
+    stub = StubLLM(latency=0)
+    rng = random.Random(seed)
+    out = []
+    for case in cases(n, seed):
+        evidence = [
+            {"chunk_id": rng.randint(1, 10 ** 6), "source": "synthetic.txt", "text": law_sentence(rng), "score": rng.random() * 0.3}
+            for _ in range(5)
+        ]
+        out.append((
+            stub.reply(f"You are a Prosecutor in a traffic violation court.\n{case['facts']}"),
+            stub.reply(f"You are a Defense in a traffic violation court.\n{case['facts']}"),
+            evidence,
+            case["facts"],
+        ))
+    return out
@@ -0,0 +1,242 @@
+"""
+Read API over the debate audit tables written by database/logger.py.
+
+    get_debate(debate_id)              -> DebateRecord (turns, judgements, evidence)
+    list_debates(since=..., verdict=...) -> DebatePage, newest first, keyset-paginated
+
+Every query is served by one of the AUDIT_INDEXES in rag/db.py;
+check_query_plans() asserts that with EXPLAIN QUERY PLAN.
+"""
+import json
+from typing import List, Optional
+from rag.db import get_conn
+from database.logger import drain_logs
+from models.pydantic_models import (
+    AgentTurnRecord,
+    EvidenceRecord,
+    JudgementRecord,
+    DebateSummary,
+    DebateRecord,
+    DebatePage,
+)
+
+MAX_PAGE_SIZE = 500
+
+
+# ----------------------------------
+# Queries (kept as constants so their plans can be checked)
+# ----------------------------------
+DEBATE_SQL = "SELECT id, case_id, started_at, finished_at, case_facts FROM debates WHERE id = ?"
+
+TURNS_SQL = "SELECT id, agent, text, timestamp FROM agent_turns WHERE debate_id = ? ORDER BY id"
+
+JUDGEMENTS_SQL = """
+SELECT id, verdict, confidence, scores_json, rubric_version, timestamp
+FROM judgements WHERE debate_id = ? ORDER BY id
+"""
+
+EVIDENCE_SQL = """
+SELECT chunk_id, source, text, score, verified
+FROM debate_evidence WHERE debate_id = ? ORDER BY id
+"""
+
+# Debates by start time; latest judgement per debate via idx_judgements_debate
+LIST_BY_DATE_SQL = """
+SELECT d.id, d.case_id, d.started_at, d.finished_at, j.verdict, j.confidence, j.timestamp
+FROM debates d
+LEFT JOIN judgements j ON j.id = (
+    SELECT MAX(id) FROM judgements WHERE debate_id = d.id
+)
+WHERE d.started_at >= ? AND (d.started_at, d.id) < (?, ?)
+ORDER BY d.started_at DESC, d.id DESC
+LIMIT ?
+"""
+
+# Judgements with a given verdict, by judgement time
+LIST_BY_VERDICT_SQL = """
+SELECT d.id, d.case_id, d.started_at, d.finished_at, j.verdict, j.confidence, j.timestamp, j.id
+FROM judgements j
+JOIN debates d ON d.id = j.debate_id
+WHERE j.verdict = ? AND j.timestamp >= ? AND (j.timestamp, j.id) < (?, ?)
+ORDER BY j.timestamp DESC, j.id DESC
+LIMIT ?
+"""
+
+# Bounds that sort below / above any CURRENT_TIMESTAMP value
+_MIN_TS = ""
+_MAX_TS = "9999-12-31 23:59:59~"
+
+
+def _upper_bound(until: Optional[str], cursor: Optional[str], numeric_key: bool):
+    """
+    Folds `until` and the page cursor into one exclusive (timestamp, key)
+    bound, so the index range starts right where the previous page ended.
+    """
+    lowest_key = -1 if numeric_key else ""
+    bound = (until, lowest_key) if until else (_MAX_TS, lowest_key)
+    if cursor:
+        ts, _, key = cursor.rpartition("|")
+        bound = min(bound, (ts, int(key) if numeric_key else key))
+    return bound
+
+
+def _encode_cursor(ts, key) -> str:
+    return f"{ts}|{key}"
+
+
+# ----------------------------------
+# Read API
+# ----------------------------------
+def get_debate(debate_id: str, conn=None) -> Optional[DebateRecord]:
+    """
+    One debate with its turns, judgements and evidence, or None if unknown.
+    Pending audit writes are drained first so the record is complete.
+    """
+    drain_logs()
+    own_conn = conn is None
+    conn = conn or get_conn()
+    cur = conn.cursor()
+
+    cur.execute(DEBATE_SQL, (debate_id,))
+    row = cur.fetchone()
+    if row is None:
+        if own_conn:
+            conn.close()
+        return None
+    _, case_id, started_at, finished_at, case_facts = row
+
+    cur.execute(TURNS_SQL, (debate_id,))
+    turns = [
+        AgentTurnRecord(id=tid, agent=agent or "", text=text or "", timestamp=ts)
+        for tid, agent, text, ts in cur.fetchall()
+    ]
+
+    cur.execute(JUDGEMENTS_SQL, (debate_id,))
+    judgements = [
+        JudgementRecord(
+            id=jid,
+            verdict=verdict,
+            confidence=confidence,
+            scores=json.loads(scores_json) if scores_json else {},
+            rubric_version=rubric_version,
+            timestamp=ts
+        )
+        for jid, verdict, confidence, scores_json, rubric_version, ts in cur.fetchall()
+    ]
+
+    cur.execute(EVIDENCE_SQL, (debate_id,))
+    evidence = [
+        EvidenceRecord(chunk_id=chunk_id, source=source, text=text, score=score or 0.0, verified=bool(verified))
+        for chunk_id, source, text, score, verified in cur.fetchall()
+    ]
+    if own_conn:
+        conn.close()
+
+    latest = judgements[-1] if judgements else None
+    return DebateRecord(
+        debate_id=debate_id,
+        case_id=case_id,
+        started_at=started_at,
+        finished_at=finished_at,
+        case_facts=case_facts,
+        verdict=latest.verdict if latest else None,
+        confidence=latest.confidence if latest else None,
+        judged_at=latest.timestamp if latest else None,
+        turns=turns,
+        judgements=judgements,
+        evidence=evidence,
+    )
+
+
+def list_debates(
+    since: str = None,
+    until: str = None,
+    verdict: str = None,
+    limit: int = 50,
+    cursor: str = None,
+    conn=None
+) -> DebatePage:
+    """
+    Debates newest first, optionally within [since, until) and with a verdict.
+    - without a verdict, debates are filtered and ordered by started_at
+    - with a verdict, matching judgements are filtered and ordered by their timestamp
+    Timestamps compare as 'YYYY-MM-DD HH:MM:SS' strings; a date alone works as a bound.
+    Pass the returned next_cursor to fetch the following page.
+    """
+    drain_logs()
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    lower = since or _MIN_TS
+    upper_ts, upper_key = _upper_bound(until, cursor, numeric_key=verdict is not None)
+
+    own_conn = conn is None
+    conn = conn or get_conn()
+    cur = conn.cursor()
+    if verdict is None:
+        cur.execute(LIST_BY_DATE_SQL, (lower, upper_ts, upper_key, limit + 1))
+    else:
+        cur.execute(LIST_BY_VERDICT_SQL, (verdict, lower, upper_ts, upper_key, limit + 1))
+    rows = cur.fetchall()
+    if own_conn:
+        conn.close()
+
+    items = [
+        DebateSummary(
+            debate_id=row[0],
+            case_id=row[1],
+            started_at=row[2],
+            finished_at=row[3],
+            verdict=row[4],
+            confidence=row[5],
+            judged_at=row[6],
+        )
+        for row in rows[:limit]
+    ]
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = _encode_cursor(last[2], last[0]) if verdict is None else _encode_cursor(last[6], last[7])
+    return DebatePage(items=items, next_cursor=next_cursor)
+
+
+# ----------------------------------
+# Plan checks
+# ----------------------------------
+def explain(sql: str, params=(), conn=None) -> List[str]:
+    """
+    EXPLAIN QUERY PLAN details for a statement, one line per plan step.
+    """
+    own_conn = conn is None
+    conn = conn or get_conn()
+    cur = conn.cursor()
+    cur.execute("EXPLAIN QUERY PLAN " + sql, params)
+    plan = [row[-1] for row in cur.fetchall()]
+    if own_conn:
+        conn.close()
+    return plan
+
+
+# Statement -> index its plan must use (no full-table scans)
+EXPECTED_PLANS = (
+    (DEBATE_SQL, ("x",), "sqlite_autoindex_debates_1"),
+    (TURNS_SQL, ("x",), "idx_agent_turns_debate"),
+    (JUDGEMENTS_SQL, ("x",), "idx_judgements_debate"),
+    (EVIDENCE_SQL, ("x",), "idx_debate_evidence_debate"),
+    (LIST_BY_DATE_SQL, (_MIN_TS, _MAX_TS, "", 10), "idx_debates_started"),
+    (LIST_BY_VERDICT_SQL, ("Guilty", _MIN_TS, _MAX_TS, -1, 10), "idx_judgements_verdict_ts"),
+)
+
+
+def check_query_plans(conn=None) -> dict:
+    """
+    Returns {index name: plan lines} and raises AssertionError if any audit
+    query is not served by its index or needs a temp B-tree to sort.
+    """
+    plans = {}
+    for sql, params, index in EXPECTED_PLANS:
+        plan = explain(sql, params, conn=conn)
+        text = "\n".join(plan)
+        if index not in text or "USE TEMP B-TREE" in text:
+            raise AssertionError(f"Query not using {index}:\n{sql.strip()}\n{text}")
+        plans[index] = plan
+    return plans
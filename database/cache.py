@@ -0,0 +1,172 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+
+
+def content_key(text: str) -> str:
+    """
+    SHA-256 of whitespace-normalized text.
+    """
+    normalized = " ".join(text.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class SqliteCache:
+    """
+    Small persistent key/value cache on its own SQLite file.
+    - entries are keyed by (namespace, key), e.g. (model name, content hash)
+    - least-recently-used entries are evicted beyond max_entries
+    - optional TTL; expired entries count as misses
+    - hit/miss/eviction counters for the current process
+    Hits only read: their LRU touches are buffered and written in one
+    transaction on the next put, every touch_interval seconds or once
+    MAX_PENDING_TOUCHES pile up (call flush() to write them now).
+    """
+
+    MAX_PENDING_TOUCHES = 1000
+
+    def __init__(self, path: str, max_entries: int = 50000, ttl_seconds=None, touch_interval: float = 5.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.touch_interval = touch_interval
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS cache (
+            namespace TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value BLOB NOT NULL,
+            created_at REAL NOT NULL,
+            last_used REAL NOT NULL,
+            PRIMARY KEY (namespace, key)
+        )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_last_used ON cache(last_used)")
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        # (namespace, key) -> last_used, not yet written
+        self._touches = {}
+        self._touched_at = time.time()
+
+    def _touch(self, namespace: str, key: str, now: float):
+        # Caller holds self._lock
+        self._touches[namespace, key] = now
+        if len(self._touches) >= self.MAX_PENDING_TOUCHES or now - self._touched_at >= self.touch_interval:
+            self._flush_touches()
+            self._conn.commit()
+
+    def _flush_touches(self):
+        # Caller holds self._lock and commits
+        if self._touches:
+            self._conn.executemany(
+                "UPDATE cache SET last_used=? WHERE namespace=? AND key=?",
+                [(used, namespace, key) for (namespace, key), used in self._touches.items()]
+            )
+            self._touches.clear()
+        self._touched_at = time.time()
+
+    def flush(self):
+        """
+        Writes buffered LRU touches.
+        """
+        with self._lock:
+            self._flush_touches()
+            self._conn.commit()
+
+    def get(self, namespace: str, key: str):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM cache WHERE namespace=? AND key=?",
+                (namespace, key)
+            ).fetchone()
+            if row is None or (self.ttl_seconds is not None and now - row[1] > self.ttl_seconds):
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touch(namespace, key, now)
+            return row[0]
+
+    def get_many(self, namespace: str, keys):
+        """
+        Returns {key: value} for the keys present (and unexpired),
+        refreshing their LRU position (buffered like get).
+        """
+        now = time.time()
+        found = {}
+        with self._lock:
+            for key in keys:
+                row = self._conn.execute(
+                    "SELECT value, created_at FROM cache WHERE namespace=? AND key=?",
+                    (namespace, key)
+                ).fetchone()
+                if row is None or (self.ttl_seconds is not None and now - row[1] > self.ttl_seconds):
+                    self.misses += 1
+                    continue
+                found[key] = row[0]
+            self.hits += len(found)
+            for key in found:
+                self._touch(namespace, key, now)
+        return found
+
+    def put(self, namespace: str, key: str, value):
+        self.put_many(namespace, [(key, value)])
+
+    def put_many(self, namespace: str, items):
+        now = time.time()
+        with self._lock:
+            cur = self._conn.cursor()
+            # Pending touches go first, so eviction sees current LRU order
+            self._flush_touches()
+            for key, value in items:
+                cur.execute(
+                    "INSERT OR IGNORE INTO cache (namespace, key, value, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                    (namespace, key, value, now, now)
+                )
+                if cur.rowcount:
+                    self._count += 1
+                else:
+                    cur.execute(
+                        "UPDATE cache SET value=?, created_at=?, last_used=? WHERE namespace=? AND key=?",
+                        (value, now, now, namespace, key)
+                    )
+            if self._count > self.max_entries:
+                # Other processes may share the file: recount before evicting
+                self._count = cur.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            if self._count > self.max_entries:
+                excess = self._count - self.max_entries
+                cur.execute(
+                    "DELETE FROM cache WHERE rowid IN (SELECT rowid FROM cache ORDER BY last_used LIMIT ?)",
+                    (excess,)
+                )
+                self.evictions += excess
+                self._count -= excess
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+            self._touches.clear()
+            self._count = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": self._count,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -1,73 +1,355 @@
+import os
 import json
-from rag.db import get_conn
+import time
+import queue
+import atexit
+import logging
+import threading
+from rag.db import transaction
+from database.tracing import current_debate_id, tracing_enabled
+
+logger = logging.getLogger(__name__)
+
+
+class AuditWriteError(RuntimeError):
+    """
+    Raised by flush() when queued audit entries failed to write.
+    """
+
+
+# -------------------------
+# Write-behind queue
+# -------------------------
+class AuditWriter:
+    """
+    Background writer for audit logs:
+    - log calls enqueue a job and return immediately
+    - one writer thread drains the queue and runs each batch of jobs
+      in a single transaction
+    - when the queue is full, callers wait up to put_timeout, then the
+      entry is dropped and counted (logging never stalls a hearing)
+    - flush() blocks until everything queued so far is written and raises
+      AuditWriteError if any entry failed since the last flush; it also
+      runs at interpreter exit
+    - drain() waits the same way but leaves failures for flush(), so
+      readers can catch up without taking errors from the writers' owners
+    Set COURTROOM_SYNC_LOGGING=1 to write inline instead (scripts/tests).
+    """
+
+    def __init__(self, maxsize: int = 10000, batch_size: int = 256, put_timeout: float = 0.05):
+        self.batch_size = batch_size
+        self.put_timeout = put_timeout
+        self.sync = os.getenv("COURTROOM_SYNC_LOGGING", "0") == "1"
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._thread = None
+        self._lock = threading.Lock()
+        # Failed entries not yet reported by flush(), and the last failure
+        self._unreported_errors = 0
+        self._last_error = None
+        self.stats = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped": 0,
+            "blocked": 0,
+            "errors": 0,
+            "batches": 0,
+            "max_depth": 0,
+            "queue_wait_ms_total": 0.0,
+        }
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(
+                        target=self._run, name="audit-writer", daemon=True
+                    )
+                    self._thread.start()
+
+    def _count(self, key, n=1):
+        # Callers' threads and the writer thread both update stats
+        with self._lock:
+            self.stats[key] += n
+
+    def submit(self, job):
+        """
+        job(cur) performs the inserts for one log entry.
+        """
+        if self.sync:
+            with transaction() as cur:
+                job(cur)
+            self._count("written")
+            return True
+
+        self._ensure_thread()
+        item = (time.perf_counter(), current_debate_id.get(), job)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            # Backpressure: wait briefly for the writer, then shed the entry
+            self._count("blocked")
+            try:
+                self._queue.put(item, timeout=self.put_timeout)
+            except queue.Full:
+                self._count("dropped")
+                return False
+        depth = self._queue.qsize()
+        with self._lock:
+            self.stats["enqueued"] += 1
+            self.stats["max_depth"] = max(self.stats["max_depth"], depth)
+        return True
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            now = time.perf_counter()
+            self._count("queue_wait_ms_total", sum(now - t for t, _, _ in batch) * 1000)
+            try:
+                with transaction() as cur:
+                    for _, _, job in batch:
+                        job(cur)
+                    self._record_batch(cur, batch, now)
+                self._count("written", len(batch))
+            except Exception:
+                # Retry one by one so a bad entry doesn't lose its batch
+                for _, _, job in batch:
+                    try:
+                        with transaction() as cur:
+                            job(cur)
+                        self._count("written")
+                    except Exception as e:
+                        logger.exception("Audit log entry failed to write")
+                        with self._lock:
+                            self.stats["errors"] += 1
+                            self._unreported_errors += 1
+                            self._last_error = e
+            self._count("batches")
+            for _ in batch:
+                self._queue.task_done()
+
+    def _record_batch(self, cur, batch, started):
+        """
+        Adds one "logger.write" metrics row per debate in the batch, with the
+        mean time its entries waited in the queue, to the batch transaction.
+        Batches holding only metric rows are not traced themselves.
+        """
+        if not tracing_enabled():
+            return
+        waits = {}
+        for enqueued_at, debate_id, job in batch:
+            if not getattr(job, "is_metric", False):
+                waits.setdefault(debate_id, []).append((started - enqueued_at) * 1000)
+        if not waits:
+            return
+        write_ms = (time.perf_counter() - started) * 1000
+        cur.executemany(
+            """
+            INSERT INTO metrics (debate_id, stage, duration_ms, queue_wait_ms, attrs_json)
+            VALUES (?, 'logger.write', ?, ?, ?)
+            """,
+            [
+                (debate_id, round(write_ms, 3), round(sum(w) / len(w), 3), json.dumps({"entries": len(w), "batch": len(batch)}))
+                for debate_id, w in waits.items()
+            ]
+        )
+
+    def drain(self, timeout: float = None) -> bool:
+        """
+        Waits until every entry queued so far is written (or failed).
+        Returns False if the timeout expired first. Never raises.
+        """
+        done = True
+        if self._thread is not None:
+            if timeout is None:
+                self._queue.join()
+            else:
+                deadline = time.monotonic() + timeout
+                while self._queue.unfinished_tasks:
+                    if time.monotonic() >= deadline:
+                        done = False
+                        break
+                    time.sleep(0.01)
+        return done
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Waits until every entry queued so far is written.
+        Returns False if the timeout expired first. Raises AuditWriteError
+        if entries failed to write since the last flush.
+        """
+        done = self.drain(timeout)
+        with self._lock:
+            failed, error = self._unreported_errors, self._last_error
+            self._unreported_errors, self._last_error = 0, None
+        if failed:
+            raise AuditWriteError(
+                f"{failed} audit log entries failed to write since the last flush; last error: {error!r}"
+            ) from error
+        return done
+
+    def metrics(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+        stats["queue_depth"] = self._queue.qsize()
+        stats["avg_queue_wait_ms"] = (
+            round(stats["queue_wait_ms_total"] / stats["written"], 3) if stats["written"] else 0.0
+        )
+        return stats
+
+
+audit_writer = AuditWriter()
+
+
+def _flush_at_exit():
+    try:
+        audit_writer.flush(10.0)
+    except AuditWriteError as e:
+        logger.error("%s", e)
+
+
+atexit.register(_flush_at_exit)
+
+
+def flush_logs(timeout: float = None) -> bool:
+    return audit_writer.flush(timeout)
+
+
+def drain_logs(timeout: float = None) -> bool:
+    """
+    flush_logs for read paths: waits for pending writes without raising
+    or clearing write failures, which stay for the next flush_logs.
+    """
+    return audit_writer.drain(timeout)
+
 
 # -------------------------
 # Debate lifecycle
 # -------------------------
-def start_debate(debate_id, case_id):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT OR IGNORE INTO debates (id, case_id, started_at) VALUES (?, ?, CURRENT_TIMESTAMP)",
-        (debate_id, case_id)
-    )
-    conn.commit()
-    conn.close()
+def start_debate(debate_id, case_id, case_facts=None):
+    audit_writer.submit(lambda cur: cur.execute(
+        "INSERT OR IGNORE INTO debates (id, case_id, started_at, case_facts) VALUES (?, ?, CURRENT_TIMESTAMP, ?)",
+        (debate_id, case_id, case_facts)
+    ))
 
 
 def end_debate(debate_id):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
+    audit_writer.submit(lambda cur: cur.execute(
         "UPDATE debates SET finished_at=CURRENT_TIMESTAMP WHERE id=?",
         (debate_id,)
-    )
-    conn.commit()
-    conn.close()
+    ))
+
+
+def log_debate_evidence(debate_id, evidence_list):
+    """
+    Snapshots the evidence a debate was argued on.
+    """
+    rows = [
+        (
+            debate_id,
+            None if e.get("chunk_id") is None else str(e.get("chunk_id")),
+            e.get("source"),
+            e.get("text"),
+            e.get("score", 0),
+            1 if e.get("verified", False) else 0
+        )
+        for e in evidence_list
+    ]
+    if rows:
+        audit_writer.submit(lambda cur: cur.executemany(
+            "INSERT INTO debate_evidence (debate_id, chunk_id, source, text, score, verified) VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        ))
 
 
 # -------------------------
 # Agent logs
 # -------------------------
 def log_agent_turn(debate_id, agent, text):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
+    audit_writer.submit(lambda cur: cur.execute(
         "INSERT INTO agent_turns (debate_id, agent, text) VALUES (?, ?, ?)",
         (debate_id, agent, text)
-    )
-    conn.commit()
-    conn.close()
+    ))
 
 
 # -------------------------
 # Judge output
 # -------------------------
-def log_judgement(debate_id, scores, verdict):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO judgements (debate_id, scores_json, verdict, confidence) VALUES (?, ?, ?, ?)",
+def log_judgement(debate_id, scores, verdict, rubric_version=None):
+    """
+    The confidence column holds the evidence_strength score, as it always
+    has; it is NULL for rubrics without that dimension.
+    """
+    scores_json = json.dumps(scores)
+    audit_writer.submit(lambda cur: cur.execute(
+        "INSERT INTO judgements (debate_id, scores_json, verdict, confidence, rubric_version) VALUES (?, ?, ?, ?, ?)",
         (
             debate_id,
-            json.dumps(scores),
+            scores_json,
             verdict,
-            scores.get("evidence_strength", 0)
+            scores.get("evidence_strength"),
+            rubric_version
         )
-    )
-    conn.commit()
-    conn.close()
+    ))
 
 
 # -------------------------
 # Memory persistence
 # -------------------------
 def log_memory(debate_id, key, value):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
+    audit_writer.submit(lambda cur: cur.execute(
         "INSERT INTO memory (debate_id, key, value) VALUES (?, ?, ?)",
         (debate_id, key, value)
-    )
-    conn.commit()
-    conn.close()
+    ))
+
+
+# -------------------------
+# Retrieval logs
+# -------------------------
+def log_retrieval(query, results):
+    """
+    Records a query and its top-k evidence (chunk_id, score) pairs.
+    """
+    hits = [(r["chunk_id"], r["score"]) for r in results]
+
+    def job(cur):
+        cur.execute(
+            "INSERT INTO queries (question) VALUES (?)",
+            (query,)
+        )
+        query_id = cur.lastrowid
+        cur.executemany(
+            "INSERT INTO evidence_logs (query_id, chunk_id, score) VALUES (?, ?, ?)",
+            [(query_id, chunk_id, score) for chunk_id, score in hits]
+        )
+
+    audit_writer.submit(job)
+
+
+def log_retrievals(pairs):
+    """
+    log_retrieval for several (query, results) pairs as one audit job,
+    so all of them are written in a single transaction.
+    """
+    entries = [(query, [(r["chunk_id"], r["score"]) for r in results]) for query, results in pairs]
+    if not entries:
+        return
+
+    def job(cur):
+        for query, hits in entries:
+            cur.execute(
+                "INSERT INTO queries (question) VALUES (?)",
+                (query,)
+            )
+            query_id = cur.lastrowid
+            cur.executemany(
+                "INSERT INTO evidence_logs (query_id, chunk_id, score) VALUES (?, ?, ?)",
+                [(query_id, chunk_id, score) for chunk_id, score in hits]
+            )
+
+    audit_writer.submit(job)
@@ -0,0 +1,263 @@
+"""
+Lightweight per-stage latency tracing.
+
+    with span("retrieve", top_k=5) as s:
+        ...
+        s["results"] = len(results)
+
+Each span records its duration (plus token counts / queue waits when the
+stage provides them) against the current debate_id and is persisted to
+the metrics table through the audit write-behind queue, so tracing adds
+microseconds to the traced call. Set COURTROOM_TRACING=0 to disable.
+
+    python -m database.tracing [--debate ID] [--out histogram.csv]
+"""
+import os
+import json
+import time
+import argparse
+import contextvars
+from contextlib import contextmanager
+import numpy as np
+
+# Debate the current code runs for; copied into asyncio tasks and to_thread calls
+current_debate_id = contextvars.ContextVar("current_debate_id", default=None)
+
+# Upper bounds (ms) of the exported histogram buckets
+HISTOGRAM_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000)
+
+
+def tracing_enabled() -> bool:
+    return os.getenv("COURTROOM_TRACING", "1") != "0"
+
+
+def estimate_tokens(text) -> int:
+    """
+    Rough token count (~4 characters per token) for latency attribution.
+    """
+    return (len(text) + 3) // 4 if text else 0
+
+
+@contextmanager
+def bind_debate(debate_id):
+    """
+    Attributes spans inside the block to debate_id.
+    """
+    token = current_debate_id.set(debate_id)
+    try:
+        yield
+    finally:
+        try:
+            current_debate_id.reset(token)
+        except ValueError:
+            # A generator finalized from another context (e.g. garbage
+            # collected after an abandoned stream); nothing to restore there
+            pass
+
+
+def record(stage: str, duration_ms: float, debate_id=None, **attrs):
+    """
+    Queues one metrics row. prompt_tokens, completion_tokens and
+    queue_wait_ms have their own columns; other attrs go to attrs_json.
+    """
+    if not tracing_enabled():
+        return
+    from database.logger import audit_writer
+
+    row = (
+        debate_id if debate_id is not None else current_debate_id.get(),
+        stage,
+        round(duration_ms, 3),
+        attrs.pop("prompt_tokens", None),
+        attrs.pop("completion_tokens", None),
+        attrs.pop("queue_wait_ms", None),
+        json.dumps(attrs, default=str) if attrs else None,
+    )
+
+    def job(cur):
+        cur.execute(
+            """
+            INSERT INTO metrics (debate_id, stage, duration_ms, prompt_tokens, completion_tokens, queue_wait_ms, attrs_json)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            row
+        )
+    # Lets the writer tell its own metric rows apart from audit entries
+    job.is_metric = True
+    audit_writer.submit(job)
+
+
+@contextmanager
+def span(stage: str, debate_id=None, **attrs):
+    """
+    Times the block as `stage`. Yields the attrs dict so the block can add
+    counts known only at the end (e.g. completion_tokens).
+    """
+    if not tracing_enabled():
+        yield attrs
+        return
+    start = time.perf_counter()
+    try:
+        yield attrs
+    except BaseException as e:
+        attrs["error"] = type(e).__name__
+        raise
+    finally:
+        record(stage, (time.perf_counter() - start) * 1000, debate_id, **attrs)
+
+
+def traced_stream(stage: str, chunks, debate_id=None, **attrs):
+    """
+    Wraps a token generator in a span that ends when the stream does,
+    counting completion tokens and time to first chunk.
+    """
+    if not tracing_enabled():
+        yield from chunks
+        return
+    debate_id = debate_id if debate_id is not None else current_debate_id.get()
+    start = time.perf_counter()
+    parts = []
+    try:
+        for chunk in chunks:
+            if not parts:
+                attrs["first_token_ms"] = round((time.perf_counter() - start) * 1000, 3)
+            parts.append(chunk)
+            yield chunk
+    finally:
+        attrs["completion_tokens"] = estimate_tokens("".join(parts))
+        record(stage, (time.perf_counter() - start) * 1000, debate_id, **attrs)
+
+
+# ----------------------------------
+# Read side
+# ----------------------------------
+def _durations_by_stage(debate_id=None, since=None, conn=None):
+    from rag.db import get_conn
+    from database.logger import drain_logs
+
+    # Waits for pending spans; write failures are left to flush_logs callers
+    drain_logs()
+    clauses, params = [], []
+    if debate_id is not None:
+        clauses.append("debate_id = ?")
+        params.append(debate_id)
+    if since is not None:
+        clauses.append("timestamp >= ?")
+        params.append(since)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    own_conn = conn is None
+    conn = conn or get_conn()
+    cur = conn.cursor()
+    cur.execute(
+        f"""
+        SELECT stage, duration_ms, COALESCE(prompt_tokens, 0), COALESCE(completion_tokens, 0), COALESCE(queue_wait_ms, 0)
+        FROM metrics {where} ORDER BY stage
+        """,
+        params
+    )
+    rows = cur.fetchall()
+    if own_conn:
+        conn.close()
+
+    stages = {}
+    for stage, duration, prompt_tokens, completion_tokens, queue_wait in rows:
+        stages.setdefault(stage, []).append((duration, prompt_tokens, completion_tokens, queue_wait))
+    return {stage: np.array(values, dtype=np.float64) for stage, values in stages.items()}
+
+
+def stage_summary(debate_id=None, since=None, conn=None):
+    """
+    Per-stage count, total/mean and p50/p95/p99 duration (ms), token totals
+    and mean queue wait, slowest total first.
+    """
+    summary = []
+    for stage, values in _durations_by_stage(debate_id, since, conn).items():
+        durations = values[:, 0]
+        p50, p95, p99 = np.percentile(durations, (50, 95, 99))
+        summary.append({
+            "stage": stage,
+            "count": int(len(durations)),
+            "total_ms": round(float(durations.sum()), 3),
+            "mean_ms": round(float(durations.mean()), 3),
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "p99_ms": round(float(p99), 3),
+            "prompt_tokens": int(values[:, 1].sum()),
+            "completion_tokens": int(values[:, 2].sum()),
+            "mean_queue_wait_ms": round(float(values[:, 3].mean()), 3),
+        })
+    summary.sort(key=lambda s: s["total_ms"], reverse=True)
+    return summary
+
+
+def histogram(debate_id=None, since=None, buckets=HISTOGRAM_BUCKETS_MS, conn=None):
+    """
+    {stage: {"buckets": {"<=1ms": n, ..., ">60000ms": n}, "p50_ms", "p95_ms", "p99_ms"}}
+    """
+    edges = np.asarray(buckets, dtype=np.float64)
+    labels = [f"<={int(b)}ms" for b in buckets] + [f">{int(buckets[-1])}ms"]
+    out = {}
+    for stage, values in _durations_by_stage(debate_id, since, conn).items():
+        durations = values[:, 0]
+        counts = np.bincount(np.searchsorted(edges, durations, side="left"), minlength=len(labels))
+        p50, p95, p99 = np.percentile(durations, (50, 95, 99))
+        out[stage] = {
+            "count": int(len(durations)),
+            "buckets": dict(zip(labels, (int(c) for c in counts))),
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "p99_ms": round(float(p99), 3),
+        }
+    return out
+
+
+def histogram_csv(hist) -> str:
+    """
+    One row per stage: stage, count, p50/p95/p99, then one column per bucket.
+    """
+    if not hist:
+        return "stage,count,p50_ms,p95_ms,p99_ms\n"
+    labels = list(next(iter(hist.values()))["buckets"])
+    lines = [",".join(["stage", "count", "p50_ms", "p95_ms", "p99_ms", *labels])]
+    for stage, h in hist.items():
+        lines.append(",".join(
+            [stage, str(h["count"]), str(h["p50_ms"]), str(h["p95_ms"]), str(h["p99_ms"])]
+            + [str(h["buckets"][label]) for label in labels]
+        ))
+    return "\n".join(lines) + "\n"
+
+
+def export_histogram(path: str, debate_id=None, since=None) -> dict:
+    """
+    Writes the histogram as CSV (.csv) or JSON (anything else).
+    """
+    hist = histogram(debate_id, since)
+    with open(path, "w", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            f.write(histogram_csv(hist))
+        else:
+            json.dump(hist, f, indent=2)
+    return hist
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize per-stage hearing latencies.")
+    parser.add_argument("--debate", default=None, help="only this debate_id")
+    parser.add_argument("--since", default=None, help="only spans at or after this 'YYYY-MM-DD HH:MM:SS'")
+    parser.add_argument("--out", default=None, help="export the histogram to .csv or .json")
+    args = parser.parse_args(argv)
+
+    for s in stage_summary(args.debate, args.since):
+        print(
+            f"{s['stage']:<24} n={s['count']:<6} total={s['total_ms']:>10.1f}ms "
+            f"p50={s['p50_ms']:>8.1f} p95={s['p95_ms']:>8.1f} p99={s['p99_ms']:>8.1f} "
+            f"tokens={s['prompt_tokens']}+{s['completion_tokens']}"
+        )
+    if args.out:
+        export_histogram(args.out, args.debate, args.since)
+        print(f"Histogram written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+LLM backend registry.
+
+Agents take any callable `llm(prompt) -> str`; a backend bundles the
+sync, async and streaming forms of one model behind a name:
+
+    backend = get_llm_backend("stub")          # or COURTROOM_LLM_BACKEND=stub
+    backend(prompt); await backend.acall(prompt); backend.stream(prompt)
+
+Built in:
+- "openrouter"  the hosted model in llm_openrouter.py (default)
+- "stub"        deterministic offline replies with configurable latency,
+                for benchmarks and load tests without a network
+"""
+import os
+import time
+import asyncio
+import hashlib
+import threading
+
+
+class PrefixedPrompt(str):
+    """
+    A prompt made of a stable shared prefix and a per-call suffix.
+    Behaves as the full prompt string everywhere; backends that support
+    prompt caching can send the prefix as a cacheable block.
+    """
+
+    def __new__(cls, prefix: str, suffix: str):
+        prompt = super().__new__(cls, prefix + suffix)
+        prompt.prefix = prefix
+        prompt.suffix = suffix
+        return prompt
+
+
+class LLMBackend:
+    """
+    Interface every backend provides.
+    """
+
+    name = "base"
+
+    def __call__(self, prompt: str) -> str:
+        raise NotImplementedError
+
+    async def acall(self, prompt: str) -> str:
+        return await asyncio.to_thread(self, prompt)
+
+    def stream(self, prompt: str):
+        yield self(prompt)
+
+
+class OpenRouterBackend(LLMBackend):
+    name = "openrouter"
+
+    def __init__(self):
+        # Imported here so the stub backend works without langchain or an API key
+        import llm_openrouter
+        self._module = llm_openrouter
+
+    def __call__(self, prompt: str) -> str:
+        return self._module.lc_llm(prompt)
+
+    async def acall(self, prompt: str) -> str:
+        return await self._module.alc_llm(prompt)
+
+    def stream(self, prompt: str):
+        yield from self._module.lc_llm_stream(prompt)
+
+
+# Vocabulary the stub draws from; includes the terms the judge rubric looks for
+_PROSECUTION_LINES = (
+    "- The driver committed a traffic violation under the Motor Vehicles Act",
+    "- Section 183 sets a fine for exceeding the speed limit",
+    "- The offence is documented by the officer's report",
+    "- The penalty rule applies to every driver without exception",
+    "- Evidence E1 confirms the vehicle was over the limit",
+    "- The law requires compliance with posted traffic signs",
+)
+_DEFENSE_LINES = (
+    "- However, there is no evidence the device was calibrated",
+    "- The charge is not proven beyond reasonable doubt",
+    "- There is a lack of independent witness testimony",
+    "- The evidence is insufficient to identify the driver",
+    "- A procedural error occurred when the challan was issued",
+    "- No witness confirmed the reading at the time",
+)
+_STRENGTHS = ("STRONG", "MODERATE", "WEAK")
+
+
+class StubLLM(LLMBackend):
+    """
+    Deterministic offline LLM: the same prompt always yields the same reply.
+    Replies follow the prompt's role (prosecutor, defense, classify,
+    summarize, deliberation) so the whole pipeline runs end to end.
+    latency is seconds per call; streamed replies spread it across tokens.
+    """
+
+    name = "stub"
+
+    def __init__(self, latency: float = None, lines: int = 4):
+        if latency is None:
+            latency = float(os.getenv("COURTROOM_STUB_LATENCY_MS", "0")) / 1000
+        self.latency = latency
+        self.lines = lines
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _seed(self, prompt: str) -> int:
+        return int.from_bytes(hashlib.sha256(prompt.encode("utf-8")).digest()[:8], "big")
+
+    def reply(self, prompt: str) -> str:
+        """
+        The completion for a prompt, without latency.
+        """
+        seed = self._seed(prompt)
+        # Prompts in agents/ state the task on their first line and the
+        # speaker on a "You are ..." line
+        head = prompt.strip().split("\n", 1)[0].lower()
+        speaker = next(
+            (line.lower() for line in prompt.splitlines() if line.strip().lower().startswith("you are")),
+            head
+        )
+
+        if head.startswith("classify"):
+            return _STRENGTHS[seed % len(_STRENGTHS)]
+        if head.startswith("summarize"):
+            lines = [line for line in prompt.splitlines()[1:] if line.strip()]
+            return "\n".join(lines[:2]) or "- No argument to summarize"
+        if "prosecutor" in speaker:
+            pool = _PROSECUTION_LINES
+        elif "defense" in speaker:
+            pool = _DEFENSE_LINES
+        else:
+            return (
+                "The court has weighed the arguments and the evidence on record. "
+                "The verdict follows from the rubric scores."
+            )
+
+        start = seed % len(pool)
+        return "\n".join(pool[(start + i) % len(pool)] for i in range(min(self.lines, len(pool))))
+
+    def _count(self):
+        with self._lock:
+            self.calls += 1
+
+    def __call__(self, prompt: str) -> str:
+        self._count()
+        if self.latency:
+            time.sleep(self.latency)
+        return self.reply(prompt)
+
+    async def acall(self, prompt: str) -> str:
+        self._count()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.reply(prompt)
+
+    def stream(self, prompt: str):
+        self._count()
+        tokens = self.reply(prompt).split(" ")
+        delay = self.latency / len(tokens)
+        for i, token in enumerate(tokens):
+            if delay:
+                time.sleep(delay)
+            yield token if i == 0 else " " + token
+
+
+# ----------------------------------
+# Registry
+# ----------------------------------
+_LLM_BACKENDS = {
+    "openrouter": OpenRouterBackend,
+    "stub": StubLLM,
+}
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def register_llm_backend(name: str, factory):
+    """
+    Registers a backend factory (a zero-argument callable returning an LLMBackend).
+    """
+    _LLM_BACKENDS[name] = factory
+    _instances.pop(name, None)
+
+
+def llm_backend_names():
+    return sorted(_LLM_BACKENDS)
+
+
+def get_llm_backend(name: str = None) -> LLMBackend:
+    """
+    Returns the shared backend instance for a name, or for
+    COURTROOM_LLM_BACKEND (default "openrouter") when name is None.
+    """
+    name = name or os.getenv("COURTROOM_LLM_BACKEND", "openrouter")
+    if name not in _LLM_BACKENDS:
+        raise ValueError(f"Unknown LLM backend '{name}', expected one of {llm_backend_names()}")
+    if name not in _instances:
+        with _instances_lock:
+            if name not in _instances:
+                _instances[name] = _LLM_BACKENDS[name]()
+    return _instances[name]
+
+
+def resolve_llm(llm=None, allm=None, stream_llm=None):
+    """
+    Normalizes agent arguments to (llm, allm, stream_llm):
+    - a backend name is looked up in the registry
+    - a backend instance fills in whichever async / streaming form is missing
+    - plain callables are returned as given
+    """
+    if isinstance(llm, str):
+        llm = get_llm_backend(llm)
+    if isinstance(llm, LLMBackend):
+        allm = allm or llm.acall
+        stream_llm = stream_llm or llm.stream
+    return llm, allm, stream_llm
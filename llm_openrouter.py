@@ -1,17 +1,112 @@
 import os
+import hashlib
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage
+from database.cache import SqliteCache
 
 load_dotenv()
 
+LLM_MODEL = "meta-llama/llama-3.1-8b-instruct"
+LLM_TEMPERATURE = 0.3
+
 llm = ChatOpenAI(
-    model="meta-llama/llama-3.1-8b-instruct",
+    model=LLM_MODEL,
     openai_api_key=os.getenv("OPENROUTER_API_KEY"),
     openai_api_base="https://openrouter.ai/api/v1",
-    temperature=0.3,
+    temperature=LLM_TEMPERATURE,
 )
 
+# Opt-in persistent cache of completions keyed by (model, temperature, SHA-256 of prompt).
+# Set COURTROOM_LLM_CACHE=1 to replay identical prompts from disk instead of the API.
+LLM_CACHE_PATH = os.getenv("COURTROOM_LLM_CACHE_PATH", "database/llm_cache.db")
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("COURTROOM_LLM_CACHE_MAX_ENTRIES", "20000"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("COURTROOM_LLM_CACHE_TTL", str(7 * 24 * 3600)))
+
+# Prompts built as llm_backends.PrefixedPrompt start with a prefix shared by
+# every turn of a hearing. Providers that cache prompt prefixes automatically
+# reuse it as is; COURTROOM_PROMPT_CACHE_CONTROL=1 also marks it with
+# cache_control for providers that only cache explicitly marked blocks.
+PROMPT_CACHE_CONTROL = os.getenv("COURTROOM_PROMPT_CACHE_CONTROL", "0") == "1"
+
+_cache = None
+
+
+def get_llm_cache():
+    global _cache
+    if os.getenv("COURTROOM_LLM_CACHE", "0") != "1":
+        return None
+    if _cache is None:
+        _cache = SqliteCache(LLM_CACHE_PATH, max_entries=LLM_CACHE_MAX_ENTRIES, ttl_seconds=LLM_CACHE_TTL_SECONDS)
+    return _cache
+
+
+def llm_cache_stats() -> dict:
+    cache = get_llm_cache()
+    return cache.stats() if cache is not None else {"enabled": False}
+
+
+def _cache_slot(prompt: str):
+    # Prompts are hashed verbatim: unlike embeddings, whitespace can change the completion
+    namespace = f"{LLM_MODEL}|temperature={LLM_TEMPERATURE}"
+    return namespace, hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def _cached(prompt: str):
+    cache = get_llm_cache()
+    if cache is None:
+        return None
+    value = cache.get(*_cache_slot(prompt))
+    return value.decode("utf-8") if value is not None else None
+
+
+def _store(prompt: str, text: str):
+    cache = get_llm_cache()
+    if cache is not None and text:
+        cache.put(*_cache_slot(prompt), text.encode("utf-8"))
+
+
+def _messages(prompt: str):
+    prefix = getattr(prompt, "prefix", None)
+    if PROMPT_CACHE_CONTROL and prefix:
+        return [HumanMessage(content=[
+            {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": prompt[len(prefix):]},
+        ])]
+    return [HumanMessage(content=str(prompt))]
+
+
 def lc_llm(prompt: str) -> str:
-    response = llm.invoke([HumanMessage(content=prompt)])
-    return response.content
\ No newline at end of file
+    cached = _cached(prompt)
+    if cached is not None:
+        return cached
+    response = llm.invoke(_messages(prompt))
+    _store(prompt, response.content)
+    return response.content
+
+
+async def alc_llm(prompt: str) -> str:
+    cached = _cached(prompt)
+    if cached is not None:
+        return cached
+    response = await llm.ainvoke(_messages(prompt))
+    _store(prompt, response.content)
+    return response.content
+
+
+def lc_llm_stream(prompt: str):
+    """
+    Yields the completion text chunk by chunk as tokens arrive.
+    A cached completion is yielded as a single chunk.
+    """
+    cached = _cached(prompt)
+    if cached is not None:
+        yield cached
+        return
+    parts = []
+    for chunk in llm.stream(_messages(prompt)):
+        if chunk.content:
+            parts.append(chunk.content)
+            yield chunk.content
+    # Only a fully consumed stream is cached, never a partial answer
+    _store(prompt, "".join(parts))
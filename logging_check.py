@@ -1,55 +1,51 @@
-import sqlite3  # Change to psycopg2 or mysql.connector if using Postgres/MySQL
+from rag.db import DB_PATH
+from database.audit import get_debate, check_query_plans
 
 
 
 DEBATE_ID = "TEST123"  # Replace with your test debate ID
 
 def check_logging():
-    # Connect to database
-    conn = sqlite3.connect("your_database.db")  # Change DB path if needed
-    cursor = conn.cursor()
-
-    print(f"Checking logs for id = {DEBATE_ID}\n")
+    print(f"Checking logs in {DB_PATH} for debate_id = {DEBATE_ID}\n")
 
     # 1️⃣ Check debate start/end
-    cursor.execute("SELECT * FROM debates WHERE id=?", (DEBATE_ID,))
-    debates = cursor.fetchall()
-    if debates:
-        print(f"✅ Debate found: {debates[0]}")
+    debate = get_debate(DEBATE_ID)
+    if debate:
+        print(f"✅ Debate found: started {debate.started_at}, finished {debate.finished_at}")
     else:
         print("❌ Debate not logged")
+        return
 
     # 2️⃣ Check agent turns
-    cursor.execute("SELECT agent, text FROM agent_turns WHERE id=?", (DEBATE_ID,))
-    turns = cursor.fetchall()
-    if turns:
+    if debate.turns:
         print("\n✅ Agent turns logged:")
-        for agent, text in turns:
-            print(f" - {agent}: {text}")
+        for turn in debate.turns:
+            print(f" - {turn.agent}: {turn.text}")
     else:
         print("❌ No agent turns logged")
 
-    # 3️⃣ Check memory logging
-    cursor.execute("SELECT speaker, text FROM memories WHERE id=?", (DEBATE_ID,))
-    memories = cursor.fetchall()
-    if memories:
-        print("\n✅ Memory logged:")
-        for speaker, text in memories:
-            print(f" - {speaker}: {text}")
+    # 3️⃣ Check evidence snapshot
+    if debate.evidence:
+        print("\n✅ Evidence logged:")
+        for ev in debate.evidence:
+            print(f" - [{ev.source}] score={ev.score:.3f} verified={ev.verified}")
     else:
-        print("❌ No memory logged")
+        print("❌ No evidence logged")
 
     # 4️⃣ Check judgement
-    cursor.execute("SELECT scores, verdict FROM judgements WHERE id=?", (DEBATE_ID,))
-    judgements = cursor.fetchall()
-    if judgements:
+    if debate.judgements:
         print("\n✅ Judgement logged:")
-        for scores, verdict in judgements:
-            print(f" - Scores: {scores}, Verdict: {verdict}")
+        for j in debate.judgements:
+            print(f" - Scores: {j.scores}, Verdict: {j.verdict}")
     else:
         print("❌ Judgement not logged")
 
-    conn.close()
+    # 5️⃣ Check audit queries use their indexes
+    try:
+        check_query_plans()
+        print("\n✅ Audit queries use their indexes")
+    except AssertionError as e:
+        print(f"\n❌ {e}")
 
 if __name__ == "__main__":
     check_logging()
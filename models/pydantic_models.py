@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, validator
-from typing import List, Dict
+from typing import List, Dict, Optional
 from datetime import datetime
 
 
@@ -35,6 +35,7 @@ class JudgementModel(BaseModel):
     prosecution_score: float
     defense_score: float
     rubric_scores: Dict[str, float]
+    rubric_version: Optional[str] = None
     reasoning: str
     case_facts: str
     evidence_considered: List[Dict]
@@ -48,5 +49,50 @@ class JudgementModel(BaseModel):
         return v
 
 
+# ----------------------------------
+# Audit read models (database/audit.py)
+# ----------------------------------
+class AgentTurnRecord(BaseModel):
+    id: int
+    agent: str
+    text: str
+    timestamp: Optional[str] = None
+
+
+class EvidenceRecord(BaseModel):
+    chunk_id: Optional[str] = None
+    source: Optional[str] = None
+    text: Optional[str] = None
+    score: float = 0.0
+    verified: bool = False
+
+
+class JudgementRecord(BaseModel):
+    id: int
+    verdict: Optional[str] = None
+    confidence: Optional[float] = None
+    scores: Dict[str, float] = Field(default_factory=dict)
+    rubric_version: Optional[str] = None
+    timestamp: Optional[str] = None
+
+
+class DebateSummary(BaseModel):
+    debate_id: str
+    case_id: Optional[str] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    verdict: Optional[str] = None
+    confidence: Optional[float] = None
+    judged_at: Optional[str] = None
+
+
+class DebateRecord(DebateSummary):
+    case_facts: Optional[str] = None
+    turns: List[AgentTurnRecord] = Field(default_factory=list)
+    judgements: List[JudgementRecord] = Field(default_factory=list)
+    evidence: List[EvidenceRecord] = Field(default_factory=list)
 
 
+class DebatePage(BaseModel):
+    items: List[DebateSummary]
+    next_cursor: Optional[str] = None
@@ -1,44 +1,277 @@
-import os
+"""
+Knowledge-base ingestion.
+
+Importing this module does no work; run it explicitly:
+
+    python -m rag.chunker [--kb-dir data/kb] [--dry-run]
+
+or call ingest(kb_dir, ...) from code.
+"""
+import sys
+import time
+import hashlib
+import argparse
 from pathlib import Path
-import json
-from .db import init_db, get_conn
-from .embedder import embed
+from concurrent.futures import ThreadPoolExecutor
+from .db import init_db, get_conn, encode_embedding, chunk_hash
 
-# Step 1: Initialize DB
-init_db()
 
-# Step 2: Load all text files from KB folder
+# Step 1: Load all text files from KB folder
 def load_kb_texts(kb_dir="data/kb"):
     docs = []
     for p in Path(kb_dir).glob("*.txt"):
         docs.append((p.name, p.read_text(encoding="utf-8")))
     return docs
 
-# Step 3: Chunking function
+# Step 2: Chunking function
 def chunk_text(text, max_words=180):
     words = text.split()
     return [" ".join(words[i:i+max_words]) for i in range(0, len(words), max_words)]
 
-# Step 4: Store chunk in DB (prevents duplicates)
+# Step 3: Store chunk in DB (prevents duplicates)
 def store_chunk(source, text, embedding):
     conn = get_conn()
     cur = conn.cursor()
-    # Check if chunk already exists
-    cur.execute("SELECT id FROM chunks WHERE source=? AND text=?", (source, text))
+    # Check if chunk already exists (indexed on source + content hash)
+    h = chunk_hash(text)
+    cur.execute("SELECT id FROM chunks WHERE source=? AND chunk_hash=?", (source, h))
     if not cur.fetchone():
         cur.execute(
-            "INSERT INTO chunks (source, text, embedding) VALUES (?, ?, ?)",
-            (source, text, json.dumps(embedding))
+            "INSERT INTO chunks (source, text, embedding_blob, embedding_dim, embedding_dtype, chunk_hash) VALUES (?, ?, ?, ?, ?, ?)",
+            (source, text, *encode_embedding(embedding), h)
         )
     conn.commit()
     conn.close()
 
-# Step 5: Insert chunks + embeddings into DB
-documents = load_kb_texts("data/kb")  # folder containing .txt files
 
-for source, text in documents:
-    for chunk in chunk_text(text):
-        emb = embed(chunk)
-        store_chunk(source, chunk, emb)
+def _rate(count, seconds):
+    return round(count / seconds, 1) if seconds else 0.0
+
+
+# Step 4: Batched ingestion pipeline
+def ingest_documents(
+    documents,
+    batch_size=64,
+    embed_workers=2,
+    commit_every=1024,
+    dry_run=False,
+    progress=None
+):
+    """
+    Brings the stored chunks of each (source, text) document in line with its text:
+    - chunks whose content hash is already stored for the source are kept as-is
+    - stored chunks no longer in the text (and duplicate copies) are deleted
+    - only new chunks are embedded, in batches on worker threads while
+      earlier batches are written, and committed in large transactions
+    With dry_run nothing is embedded or written; stats describe the plan.
+    progress(done, total) is called after each written batch.
+    Returns per-stage throughput stats.
+    """
+    stats = {"chunks": 0, "skipped": 0, "inserted": 0, "deleted": 0}
+
+    # Chunking + diff against stored content hashes (indexed per source)
+    t0 = time.perf_counter()
+    conn = get_conn()
+    cur = conn.cursor()
+
+    pending, stale = [], []
+    for source, text in documents:
+        chunks = chunk_text(text)
+        hashes = [chunk_hash(chunk) for chunk in chunks]
+        wanted = set(hashes)
+
+        cur.execute("SELECT id, chunk_hash FROM chunks WHERE source=? ORDER BY id", (source,))
+        stored = set()
+        for cid, h in cur.fetchall():
+            if h in stored or h not in wanted:
+                stale.append(cid)
+            else:
+                stored.add(h)
+
+        for chunk, h in zip(chunks, hashes):
+            stats["chunks"] += 1
+            if h in stored:
+                stats["skipped"] += 1
+                continue
+            stored.add(h)
+            pending.append((source, chunk, h))
+    chunk_seconds = time.perf_counter() - t0
+
+    stats["deleted"] = len(stale)
+    stats["to_embed"] = len(pending)
+    embed_seconds = 0.0
+    write_seconds = 0.0
+    t1 = time.perf_counter()
+
+    if not dry_run:
+        cur.executemany("DELETE FROM chunks WHERE id=?", [(cid,) for cid in stale])
+
+        batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        if batches:
+            # Imported lazily: the API client is only needed when something is embedded
+            from .embedder import embed_batch
+
+            def embed_rows(rows):
+                start = time.perf_counter()
+                embeddings = embed_batch([chunk for _, chunk, _ in rows], batch_size=batch_size)
+                return embeddings, time.perf_counter() - start
+
+            # Embedding batches overlap with writing the ones already returned
+            uncommitted = 0
+            with ThreadPoolExecutor(max_workers=embed_workers) as pool:
+                for rows, (embeddings, seconds) in zip(batches, pool.map(embed_rows, batches)):
+                    embed_seconds += seconds
+                    start = time.perf_counter()
+                    cur.executemany(
+                        "INSERT INTO chunks (source, text, embedding_blob, embedding_dim, embedding_dtype, chunk_hash) VALUES (?, ?, ?, ?, ?, ?)",
+                        [(source, chunk, *encode_embedding(emb), h) for (source, chunk, h), emb in zip(rows, embeddings)]
+                    )
+                    stats["inserted"] += len(rows)
+                    uncommitted += len(rows)
+                    if uncommitted >= commit_every:
+                        conn.commit()
+                        uncommitted = 0
+                    write_seconds += time.perf_counter() - start
+                    if progress:
+                        progress(stats["inserted"], len(pending))
+        conn.commit()
+    conn.close()
+    total_seconds = chunk_seconds + time.perf_counter() - t1
+
+    stats.update({
+        "chunk_seconds": round(chunk_seconds, 3),
+        "embed_seconds": round(embed_seconds, 3),
+        "write_seconds": round(write_seconds, 3),
+        "total_seconds": round(total_seconds, 3),
+        "chunk_per_sec": _rate(stats["chunks"], chunk_seconds),
+        "embed_per_sec": _rate(stats["inserted"], embed_seconds),
+        "write_per_sec": _rate(stats["inserted"], write_seconds),
+    })
+    return stats
+
+
+# Step 5: Incremental re-indexing of the KB folder
+def ingest(kb_dir="data/kb", dry_run=False, progress=None, **kwargs):
+    """
+    Re-ingests only what changed in kb_dir, using the kb_files manifest:
+    - files whose size and mtime match the manifest are not even read
+    - files whose content hash matches are only re-stamped
+    - changed or new files go through ingest_documents
+    - chunks of files removed from kb_dir are deleted
+    Extra keyword arguments are passed to ingest_documents.
+    """
+    init_db()
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute("SELECT source, size, mtime_ns, sha256 FROM kb_files")
+    manifest = {source: (size, mtime_ns, sha) for source, size, mtime_ns, sha in cur.fetchall()}
+
+    paths = sorted(Path(kb_dir).glob("*.txt"))
+    changed, restamped, unchanged = [], [], 0
+    for p in paths:
+        st = p.stat()
+        known = manifest.get(p.name)
+        if known and known[0] == st.st_size and known[1] == st.st_mtime_ns:
+            unchanged += 1
+            continue
+        text = p.read_text(encoding="utf-8")
+        sha = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        if known and known[2] == sha:
+            restamped.append((st.st_size, st.st_mtime_ns, p.name))
+            unchanged += 1
+            continue
+        changed.append((p.name, text, st.st_size, st.st_mtime_ns, sha))
+
+    removed = sorted(set(manifest) - {p.name for p in paths})
+    if removed:
+        cur.execute(
+            f"SELECT COUNT(*) FROM chunks WHERE source IN ({','.join('?' * len(removed))})",
+            removed
+        )
+        removed_chunks = cur.fetchone()[0]
+    else:
+        removed_chunks = 0
+
+    if not dry_run:
+        cur.executemany("UPDATE kb_files SET size=?, mtime_ns=? WHERE source=?", restamped)
+        cur.executemany("DELETE FROM chunks WHERE source=?", [(s,) for s in removed])
+        cur.executemany("DELETE FROM kb_files WHERE source=?", [(s,) for s in removed])
+        conn.commit()
+
+    stats = ingest_documents(
+        [(source, text) for source, text, *_ in changed],
+        dry_run=dry_run,
+        progress=progress,
+        **kwargs
+    )
+
+    if not dry_run:
+        # Manifest is updated only after the chunks landed, so a crash re-processes the file
+        cur.executemany(
+            """
+            INSERT OR REPLACE INTO kb_files (source, size, mtime_ns, sha256, chunk_count, indexed_at)
+            VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            """,
+            [(source, size, mtime_ns, sha, len(chunk_text(text))) for source, text, size, mtime_ns, sha in changed]
+        )
+        conn.commit()
+    conn.close()
+
+    stats.update({
+        "dry_run": dry_run,
+        "files": len(paths),
+        "files_unchanged": unchanged,
+        "files_changed": len(changed),
+        "files_removed": len(removed),
+    })
+    stats["deleted"] += removed_chunks
+    return stats
+
+
+def print_ingest_stats(stats):
+    if stats.get("dry_run"):
+        print("Dry run: nothing was embedded or written.")
+    if "files" in stats:
+        print(
+            f"Files: {stats['files']} total, {stats['files_changed']} changed, "
+            f"{stats['files_unchanged']} unchanged, {stats['files_removed']} removed"
+        )
+    print(
+        f"Chunks: {stats['chunks']} total, {stats['inserted']} inserted "
+        f"({stats['to_embed']} to embed), {stats['skipped']} already stored, "
+        f"{stats['deleted']} deleted\n"
+        f"  chunking : {stats['chunk_seconds']}s ({stats['chunk_per_sec']} chunks/s)\n"
+        f"  embedding: {stats['embed_seconds']}s ({stats['embed_per_sec']} chunks/s, summed over workers)\n"
+        f"  writing  : {stats['write_seconds']}s ({stats['write_per_sec']} chunks/s)\n"
+        f"  total    : {stats['total_seconds']}s"
+    )
+
+
+def _print_progress(done, total):
+    print(f"\r  embedded {done}/{total} chunks", end="" if done < total else "\n", file=sys.stderr, flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest the traffic-law knowledge base.")
+    parser.add_argument("--kb-dir", default="data/kb", help="folder containing .txt files")
+    parser.add_argument("--dry-run", action="store_true", help="report changes without embedding or writing")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=2, help="concurrent embedding requests")
+    parser.add_argument("--commit-every", type=int, default=1024)
+    parser.add_argument("--quiet", action="store_true", help="no progress output")
+    args = parser.parse_args(argv)
+
+    stats = ingest(
+        args.kb_dir,
+        dry_run=args.dry_run,
+        progress=None if args.quiet else _print_progress,
+        batch_size=args.batch_size,
+        embed_workers=args.workers,
+        commit_every=args.commit_every,
+    )
+    print_ingest_stats(stats)
+    return stats
+
 
-print("Chunks inserted and embeddings generated.")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
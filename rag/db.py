@@ -1,12 +1,191 @@
 import sqlite3
 import os
 import json
+import hashlib
+import threading
+from contextlib import contextmanager
+import numpy as np
 
 DB_PATH = "database/courtroom.db"
 
+# Embeddings are stored as raw little-endian BLOBs ("float32" or "float16")
+EMBEDDING_DTYPE = "float32"
+
+# -------------------------
+# Connection pool
+# -------------------------
+# Applied once per pooled connection. WAL lets Streamlit sessions read
+# while another thread writes; NORMAL sync is durable across app crashes
+# (only an OS crash can lose the last transactions).
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA mmap_size=268435456",
+)
+# Compiled statements kept per connection; repeated logging/retrieval
+# SQL is prepared once per thread instead of once per call
+STATEMENT_CACHE_SIZE = 256
+
+_pool = threading.local()
+_pool_dirs = set()
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    Long-lived per-thread connection. close() only ends the caller's use:
+    uncommitted work is rolled back (as a real close would discard it)
+    and the connection stays open for the thread's next get_conn().
+    """
+
+    def close(self):
+        if self.in_transaction:
+            self.rollback()
+
+    def really_close(self):
+        super().close()
+
+
 def get_conn():
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    return sqlite3.connect(DB_PATH)
+    """
+    Returns this thread's pooled connection to DB_PATH, opening it on
+    first use. Callers may keep the commit()/close() pattern.
+    """
+    conns = getattr(_pool, "conns", None)
+    if conns is None:
+        conns = _pool.conns = {}
+
+    conn = conns.get(DB_PATH)
+    if conn is None:
+        directory = os.path.dirname(DB_PATH)
+        if directory and directory not in _pool_dirs:
+            os.makedirs(directory, exist_ok=True)
+            _pool_dirs.add(directory)
+        conn = sqlite3.connect(
+            DB_PATH,
+            timeout=30,
+            factory=PooledConnection,
+            cached_statements=STATEMENT_CACHE_SIZE
+        )
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        conns[DB_PATH] = conn
+    return conn
+
+
+def close_thread_connections():
+    """
+    Really closes the calling thread's pooled connections.
+    """
+    for conn in getattr(_pool, "conns", {}).values():
+        conn.really_close()
+    _pool.conns = {}
+
+
+@contextmanager
+def transaction():
+    """
+    Yields a cursor on the pooled connection and commits on success.
+    """
+    conn = get_conn()
+    try:
+        yield conn.cursor()
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+# -------------------------
+# Embedding encoding
+# -------------------------
+def encode_embedding(embedding, dtype=None):
+    """
+    Returns (blob, dim, dtype) for storage in the chunks table.
+    """
+    dtype = dtype or EMBEDDING_DTYPE
+    arr = np.asarray(embedding, dtype=np.dtype(dtype).newbyteorder("<"))
+    return arr.tobytes(), int(arr.shape[0]), dtype
+
+
+def decode_embedding(blob, dim, dtype):
+    """
+    Zero-copy read-only view over a stored embedding BLOB.
+    """
+    arr = np.frombuffer(blob, dtype=np.dtype(dtype).newbyteorder("<"))
+    if dim is not None and arr.shape[0] != dim:
+        raise ValueError(f"Embedding BLOB holds {arr.shape[0]} values, expected {dim}")
+    return arr
+
+
+def chunk_hash(text: str) -> str:
+    """
+    Content hash stored with each chunk for change detection.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _add_missing_columns(cur, table, columns):
+    cur.execute(f"PRAGMA table_info({table})")
+    existing = {row[1] for row in cur.fetchall()}
+    for name, decl in columns:
+        if name not in existing:
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+
+
+def _migrate_chunk_embeddings(cur, dtype=None):
+    """
+    Adds the binary embedding columns to older databases and converts
+    JSON-text embeddings in place. Safe to run repeatedly.
+    """
+    _add_missing_columns(cur, "chunks", (
+        ("embedding_blob", "BLOB"),
+        ("embedding_dim", "INTEGER"),
+        ("embedding_dtype", "TEXT"),
+    ))
+
+    cur.execute(
+        "SELECT id, embedding FROM chunks WHERE embedding_blob IS NULL AND embedding IS NOT NULL"
+    )
+    rows = cur.fetchall()
+    converted = []
+    for cid, emb_json in rows:
+        blob, dim, dt = encode_embedding(json.loads(emb_json), dtype)
+        converted.append((blob, dim, dt, cid))
+    cur.executemany(
+        "UPDATE chunks SET embedding_blob=?, embedding_dim=?, embedding_dtype=?, embedding=NULL WHERE id=?",
+        converted
+    )
+    return len(converted)
+
+
+def _migrate_chunk_hashes(cur):
+    """
+    Adds and backfills chunks.chunk_hash on older databases.
+    """
+    _add_missing_columns(cur, "chunks", (("chunk_hash", "TEXT"),))
+    cur.execute("SELECT id, text FROM chunks WHERE chunk_hash IS NULL")
+    cur.executemany(
+        "UPDATE chunks SET chunk_hash=? WHERE id=?",
+        [(chunk_hash(text or ""), cid) for cid, text in cur.fetchall()]
+    )
+
+
+def migrate_embeddings(dtype=None, vacuum=True):
+    """
+    Converts every JSON-text embedding to a binary BLOB and reclaims
+    the freed space. Returns the number of converted rows.
+    """
+    conn = get_conn()
+    cur = conn.cursor()
+    count = _migrate_chunk_embeddings(cur, dtype)
+    conn.commit()
+    if vacuum and count:
+        conn.execute("VACUUM")
+    conn.close()
+    return count
+
 
 def init_db():
     conn = get_conn()
@@ -18,9 +197,45 @@ def init_db():
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         source TEXT,
         text TEXT,
-        embedding TEXT
+        embedding TEXT,
+        embedding_blob BLOB,
+        embedding_dim INTEGER,
+        embedding_dtype TEXT,
+        chunk_hash TEXT
     )
     """)
+    _migrate_chunk_embeddings(cur)
+    _migrate_chunk_hashes(cur)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_chunks_source_hash ON chunks(source, chunk_hash)")
+
+    # Ingestion manifest: one row per knowledge-base file
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS kb_files (
+        source TEXT PRIMARY KEY,
+        size INTEGER,
+        mtime_ns INTEGER,
+        sha256 TEXT,
+        chunk_count INTEGER,
+        indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+    # Bumped on every chunks write so in-memory indexes know when to reload
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS chunks_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL
+    )
+    """)
+    cur.execute("INSERT OR IGNORE INTO chunks_version (id, version) VALUES (1, 0)")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS chunks_version_{event.lower()}
+        AFTER {event} ON chunks
+        BEGIN
+            UPDATE chunks_version SET version = version + 1 WHERE id = 1;
+        END
+        """)
 
     cur.execute("""
     CREATE TABLE IF NOT EXISTS queries (
@@ -61,9 +276,11 @@ def init_db():
         case_id TEXT,
         started_at TIMESTAMP,
         finished_at TIMESTAMP,
+        case_facts TEXT,
         FOREIGN KEY(case_id) REFERENCES cases(id)
     )
     """)
+    _add_missing_columns(cur, "debates", (("case_facts", "TEXT"),))
 
     # Each turn by agents (prosecutor, defense, witness, judge)
     cur.execute("""
@@ -85,10 +302,12 @@ def init_db():
         scores_json TEXT,
         verdict TEXT,
         confidence REAL,
+        rubric_version TEXT,
         timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
         FOREIGN KEY(debate_id) REFERENCES debates(id)
     )
     """)
+    _add_missing_columns(cur, "judgements", (("rubric_version", "TEXT"),))
 
     # Agent memory storage
     cur.execute("""
@@ -102,5 +321,70 @@ def init_db():
     )
     """)
 
+    # Evidence submitted to each debate (snapshot of the retrieved chunks)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS debate_evidence (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        debate_id TEXT,
+        chunk_id TEXT,
+        source TEXT,
+        text TEXT,
+        score REAL,
+        verified INTEGER DEFAULT 0,
+        FOREIGN KEY(debate_id) REFERENCES debates(id)
+    )
+    """)
+
+    # Per-stage latency spans (database/tracing.py)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS metrics (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        debate_id TEXT,
+        stage TEXT,
+        duration_ms REAL,
+        prompt_tokens INTEGER,
+        completion_tokens INTEGER,
+        queue_wait_ms REAL,
+        attrs_json TEXT,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+    # Secondary indexes for the audit read API (database/audit.py)
+    for ddl in AUDIT_INDEXES:
+        cur.execute(ddl)
+
     conn.commit()
     conn.close()
+
+
+AUDIT_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_debates_started ON debates(started_at, id)",
+    "CREATE INDEX IF NOT EXISTS idx_agent_turns_debate ON agent_turns(debate_id, id)",
+    "CREATE INDEX IF NOT EXISTS idx_judgements_debate ON judgements(debate_id, id)",
+    "CREATE INDEX IF NOT EXISTS idx_judgements_verdict_ts ON judgements(verdict, timestamp, id)",
+    "CREATE INDEX IF NOT EXISTS idx_judgements_ts ON judgements(timestamp, id)",
+    "CREATE INDEX IF NOT EXISTS idx_memory_debate ON memory(debate_id, id)",
+    "CREATE INDEX IF NOT EXISTS idx_evidence_logs_query ON evidence_logs(query_id)",
+    "CREATE INDEX IF NOT EXISTS idx_debate_evidence_debate ON debate_evidence(debate_id, id)",
+    "CREATE INDEX IF NOT EXISTS idx_metrics_debate ON metrics(debate_id, stage)",
+    "CREATE INDEX IF NOT EXISTS idx_metrics_ts ON metrics(timestamp)",
+)
+
+
+def get_chunks_version(conn):
+    """
+    Returns a token that changes whenever the chunks table changes.
+    Falls back to (count, max id) for databases created before init_db
+    added the version table.
+    """
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT version FROM chunks_version WHERE id = 1")
+        row = cur.fetchone()
+        if row is not None:
+            return ("v", row[0])
+    except sqlite3.OperationalError:
+        pass
+    cur.execute("SELECT COUNT(*), MAX(id) FROM chunks")
+    return ("n",) + tuple(cur.fetchone())
@@ -1,20 +1,165 @@
 import os
-from openai import OpenAI
+import re
+import hashlib
+import threading
+import numpy as np
 from dotenv import load_dotenv
+from database.cache import SqliteCache, content_key
+from database.tracing import span, estimate_tokens
 
 load_dotenv()
 
-client = OpenAI(
-    base_url="https://openrouter.ai/api/v1",
-    api_key=os.getenv("OPENROUTER_API_KEY"),
-)
-
 EMBED_MODEL = "text-embedding-3-small"
 
+# Persistent cache of embeddings keyed by (model, SHA-256 of normalized text).
+# Set COURTROOM_EMBED_CACHE=0 to always call the API.
+EMBED_CACHE_PATH = os.getenv("COURTROOM_EMBED_CACHE_PATH", "database/embedding_cache.db")
+EMBED_CACHE_MAX_ENTRIES = int(os.getenv("COURTROOM_EMBED_CACHE_MAX_ENTRIES", "50000"))
+
+_cache = None
+
+
+def get_embed_cache():
+    global _cache
+    if os.getenv("COURTROOM_EMBED_CACHE", "1") == "0":
+        return None
+    if _cache is None:
+        _cache = SqliteCache(EMBED_CACHE_PATH, max_entries=EMBED_CACHE_MAX_ENTRIES)
+    return _cache
+
+
+# ----------------------------------
+# Embedding backends
+# ----------------------------------
+class OpenRouterEmbedder:
+    """
+    Remote embeddings via the OpenRouter (OpenAI-compatible) API.
+    The client is created on first use, so importing needs no API key.
+    """
+
+    def __init__(self, model: str = EMBED_MODEL):
+        self.model = model
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI(
+                base_url="https://openrouter.ai/api/v1",
+                api_key=os.getenv("OPENROUTER_API_KEY"),
+            )
+        return self._client
+
+    def embed_batch(self, texts):
+        response = self.client.embeddings.create(
+            model=self.model,
+            input=texts
+        )
+        results = [None] * len(texts)
+        for item in response.data:
+            results[item.index] = item.embedding
+        return results
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class HashingEmbedder:
+    """
+    Offline bag-of-words embedder: unigrams and bigrams are hashed into
+    `dim` signed buckets and L2-normalized. Deterministic and network-free,
+    for benchmarks and load tests; similar texts still land close together.
+    """
+
+    def __init__(self, dim: int = None):
+        self.dim = dim or int(os.getenv("COURTROOM_EMBED_DIM", "384"))
+        self.model = f"hashing-{self.dim}"
 
+    def embed_one(self, text: str):
+        words = _TOKEN_RE.findall(text.lower())
+        features = words + [a + " " + b for a, b in zip(words, words[1:])]
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for feature in features:
+            h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+            vec[h % self.dim] += 1.0 if (h >> 63) else -1.0
+        norm = np.linalg.norm(vec)
+        if norm:
+            vec /= norm
+        return vec.tolist()
+
+    def embed_batch(self, texts):
+        return [self.embed_one(t) for t in texts]
+
+
+_EMBED_BACKENDS = {
+    "openrouter": OpenRouterEmbedder,
+    "hashing": HashingEmbedder,
+}
+_embedders = {}
+_embedders_lock = threading.Lock()
+
+
+def register_embed_backend(name: str, factory):
+    """
+    Registers an embedder factory; embedders expose `model` and `embed_batch(texts)`.
+    """
+    _EMBED_BACKENDS[name] = factory
+    _embedders.pop(name, None)
+
+
+def get_embedder(name: str = None):
+    """
+    Returns the shared embedder for a name, or for
+    COURTROOM_EMBED_BACKEND (default "openrouter") when name is None.
+    """
+    name = name or os.getenv("COURTROOM_EMBED_BACKEND", "openrouter")
+    if name not in _EMBED_BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{name}', expected one of {sorted(_EMBED_BACKENDS)}")
+    if name not in _embedders:
+        with _embedders_lock:
+            if name not in _embedders:
+                _embedders[name] = _EMBED_BACKENDS[name]()
+    return _embedders[name]
+
+
+# ----------------------------------
+# Public API
+# ----------------------------------
 def embed(text: str):
-    response = client.embeddings.create(
-        model=EMBED_MODEL,
-        input=text
-    )
-    return response.data[0].embedding
\ No newline at end of file
+    return embed_batch([text])[0]
+
+
+def embed_batch(texts, batch_size: int = 64):
+    """
+    Embeds many texts with one backend request per batch of cache misses.
+    Returns embeddings in input order.
+    """
+    embedder = get_embedder()
+    texts = list(texts)
+    with span("embed", model=embedder.model, texts=len(texts)) as sp:
+        keys = [content_key(t) for t in texts]
+        cache = get_embed_cache()
+        # Cache entries are namespaced by model, so backends never mix vectors
+        found = cache.get_many(embedder.model, set(keys)) if cache is not None else {}
+
+        results = [None] * len(texts)
+        missing = []
+        for i, key in enumerate(keys):
+            if key in found:
+                results[i] = np.frombuffer(found[key], dtype="<f4").tolist()
+            else:
+                missing.append(i)
+        sp["cache_hits"] = len(texts) - len(missing)
+        sp["prompt_tokens"] = sum(estimate_tokens(texts[i]) for i in missing)
+
+        for start in range(0, len(missing), batch_size):
+            batch = missing[start:start + batch_size]
+            for i, embedding in zip(batch, embedder.embed_batch([texts[i] for i in batch])):
+                results[i] = embedding
+            if cache is not None:
+                cache.put_many(embedder.model, [
+                    (keys[i], np.asarray(results[i], dtype="<f4").tobytes()) for i in batch
+                ])
+
+    return results
@@ -0,0 +1,91 @@
+"""
+Evidence sets: retrieved and manual evidence merged by chunk before a debate.
+
+Several queries often return the same chunk; appending every result
+repeats it in prompts and counts its score more than once at judgement.
+"""
+import uuid
+
+MAX_EVIDENCE_ITEMS = 20
+MERGE_MODES = ("max", "fused")
+
+
+def evidence_key(evidence: dict):
+    """
+    Chunks are identified by chunk_id; evidence without one by its text.
+    """
+    if evidence.get("chunk_id") is not None:
+        return ("chunk", str(evidence["chunk_id"]))
+    return ("text", " ".join(str(evidence.get("text", "")).split()))
+
+
+def manual_evidence(text: str, score: float = 0.9, source: str = "Manual Entry") -> dict:
+    """
+    Evidence typed in by a user, with an id that cannot collide with chunk ids.
+    """
+    return {
+        "text": text,
+        "score": score,
+        "source": source,
+        "chunk_id": f"manual-{uuid.uuid4().hex[:12]}",
+    }
+
+
+class EvidenceSet:
+    """
+    Evidence keyed on chunk_id:
+    - a chunk added again keeps one entry; its score becomes the max of
+      the scores seen (merge="max") or their noisy-OR fusion (merge="fused"),
+      so chunks found by several queries rank higher
+    - "hits" counts how many times the chunk was found
+    - items() returns the best max_items, highest score first
+    """
+
+    def __init__(self, evidence=(), max_items: int = MAX_EVIDENCE_ITEMS, merge: str = "max"):
+        if merge not in MERGE_MODES:
+            raise ValueError(f"Unknown merge mode '{merge}', expected one of {MERGE_MODES}")
+        self.max_items = max_items
+        self.merge = merge
+        self._items = {}
+        self.extend(evidence)
+
+    def add(self, evidence: dict):
+        key = evidence_key(evidence)
+        current = self._items.get(key)
+        if current is None:
+            item = dict(evidence)
+            item["score"] = float(item.get("score", 0))
+            item["hits"] = int(item.get("hits", 1))
+            self._items[key] = item
+            return
+
+        score = float(evidence.get("score", 0))
+        if self.merge == "max":
+            current["score"] = max(current["score"], score)
+        else:
+            current["score"] = 1 - (1 - current["score"]) * (1 - min(max(score, 0.0), 1.0))
+        current["hits"] += int(evidence.get("hits", 1))
+
+    def extend(self, evidence_list):
+        for evidence in evidence_list:
+            self.add(evidence)
+
+    def items(self):
+        ranked = sorted(self._items.values(), key=lambda e: e["score"], reverse=True)
+        return ranked[:self.max_items] if self.max_items else ranked
+
+    def __len__(self):
+        return min(len(self._items), self.max_items) if self.max_items else len(self._items)
+
+    def __iter__(self):
+        return iter(self.items())
+
+
+def merge_evidence(existing, new, max_items: int = MAX_EVIDENCE_ITEMS, merge: str = "max"):
+    """
+    existing + new as a deduplicated, capped list (best first).
+    """
+    evidence = EvidenceSet(existing, max_items=None, merge=merge)
+    evidence.extend(new)
+    evidence.max_items = max_items
+    return evidence.items()
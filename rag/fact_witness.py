@@ -1,4 +1,19 @@
-from rag.retriever import retrieve
+from rag.retriever import retrieve, retrieve_many
+from rag.evidence import EvidenceSet, MAX_EVIDENCE_ITEMS
 
 def fact_witness_answer(query: str):
     return retrieve(query)
+
+
+def fact_witness_many(queries, top_k: int = 5, max_items: int = MAX_EVIDENCE_ITEMS, merge: str = "max"):
+    """
+    Evidence for several queries at once: all queries are embedded and
+    scored in one batch, and chunks found by more than one query are
+    merged by chunk_id.
+    Returns a deduplicated list of at most max_items, best first.
+    """
+    queries = list(dict.fromkeys(q for q in queries if q))
+    evidence = EvidenceSet(max_items=max_items, merge=merge)
+    for results in retrieve_many(queries, top_k)["per_query"]:
+        evidence.extend(results)
+    return evidence.items()
@@ -0,0 +1,302 @@
+import os
+import json
+import argparse
+import threading
+from datetime import datetime
+import numpy as np
+from .db import get_conn, get_chunks_version
+from .vector_store import load_chunk_matrix, normalize_query, normalize_queries, rank_unique, first_per_group
+
+try:
+    import faiss
+except ImportError:  # flat indexes work without faiss
+    faiss = None
+
+INDEX_DIR = "database/kb_index"
+INDEX_KINDS = ("flat", "ivf", "hnsw")
+
+# Sidecar layout (all keyed by chunks.id):
+#   meta.json    kind, dim, count, chunks version the index was built from
+#   ids.npy      chunk ids, row-aligned with the vectors
+#   groups.npy   text group per row (duplicate texts share a group)
+#   vectors.npy  normalized float32 matrix             (flat)
+#   faiss.index  faiss IVF / HNSW index over chunk ids (ivf, hnsw)
+
+
+def _atomic_save_npy(path, arr):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, arr)
+    os.replace(tmp, path)
+
+
+# ----------------------------------
+# Build step
+# ----------------------------------
+def build_index(kind="flat", index_dir=INDEX_DIR, nlist=None, hnsw_m=32):
+    """
+    Writes a memory-mappable vector index for the current chunks table.
+    Returns the index metadata.
+    """
+    if kind not in INDEX_KINDS:
+        raise ValueError(f"Unknown index kind '{kind}', expected one of {INDEX_KINDS}")
+    if kind != "flat" and faiss is None:
+        raise RuntimeError(f"'{kind}' indexes need faiss-cpu installed")
+
+    conn = get_conn()
+    version = get_chunks_version(conn)
+    ids, _, _, groups, matrix = load_chunk_matrix(conn)
+    conn.close()
+
+    os.makedirs(index_dir, exist_ok=True)
+    meta_path = os.path.join(index_dir, "meta.json")
+    # Readers treat a missing meta.json as "no index" while files are replaced
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    dim = int(matrix.shape[1]) if len(ids) else 0
+    meta = {
+        "kind": kind,
+        "dim": dim,
+        "count": int(len(ids)),
+        "chunks_version": list(version),
+        "built_at": datetime.utcnow().isoformat(),
+    }
+
+    _atomic_save_npy(os.path.join(index_dir, "ids.npy"), ids)
+    _atomic_save_npy(os.path.join(index_dir, "groups.npy"), groups)
+
+    if kind == "flat":
+        _atomic_save_npy(os.path.join(index_dir, "vectors.npy"), matrix)
+    else:
+        if kind == "ivf":
+            nlist = nlist or max(1, int(np.sqrt(len(ids))))
+            nlist = min(nlist, max(1, len(ids)))
+            quantizer = faiss.IndexFlatIP(dim)
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_INNER_PRODUCT)
+            index.train(matrix)
+            index.add_with_ids(matrix, ids)
+            meta["nlist"] = nlist
+        else:
+            index = faiss.IndexIDMap2(faiss.IndexHNSWFlat(dim, hnsw_m, faiss.METRIC_INNER_PRODUCT))
+            index.add_with_ids(matrix, ids)
+            meta["hnsw_m"] = hnsw_m
+
+        tmp = os.path.join(index_dir, "faiss.index.tmp")
+        faiss.write_index(index, tmp)
+        os.replace(tmp, os.path.join(index_dir, "faiss.index"))
+
+    with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(meta_path + ".tmp", meta_path)
+    return meta
+
+
+# ----------------------------------
+# Read side
+# ----------------------------------
+class KBIndex:
+    """
+    Read-only view over an index sidecar. Vectors are memory-mapped, so
+    every process and Streamlit session shares the OS page cache instead
+    of holding its own copy of the matrix.
+    """
+
+    def __init__(self, index_dir, meta, nprobe=8):
+        self.index_dir = index_dir
+        self.meta = meta
+        self.kind = meta["kind"]
+
+        self.ids = np.load(os.path.join(index_dir, "ids.npy"), mmap_mode="r")
+        self.groups = np.load(os.path.join(index_dir, "groups.npy"), mmap_mode="r")
+        self.vectors = None
+        self.faiss_index = None
+
+        if self.kind == "flat":
+            self.vectors = np.load(os.path.join(index_dir, "vectors.npy"), mmap_mode="r")
+        else:
+            path = os.path.join(index_dir, "faiss.index")
+            try:
+                self.faiss_index = faiss.read_index(path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+            except RuntimeError:
+                # Index types without mmap support are read normally
+                self.faiss_index = faiss.read_index(path)
+            if self.kind == "ivf":
+                self.faiss_index.nprobe = min(nprobe, meta.get("nlist", nprobe))
+
+    def _rank(self, q, top_k):
+        """
+        Returns [(chunk_id, score), ...] best first, one per distinct text.
+        """
+        if self.vectors is not None:
+            scores = self.vectors @ q
+            return [(int(self.ids[i]), float(scores[i])) for i in rank_unique(scores, self.groups, top_k)]
+
+        n = len(self.ids)
+        window = min(n, top_k * 4)
+        while True:
+            scores, found = self.faiss_index.search(q.reshape(1, -1), window)
+            found_ids = found[0][found[0] >= 0]
+            found_scores = scores[0][found[0] >= 0]
+            # faiss returns chunk ids; map them back to rows for the text groups
+            found_groups = self.groups[np.searchsorted(self.ids, found_ids)]
+            picked = first_per_group(range(len(found_ids)), found_groups, top_k)
+            if len(picked) >= top_k or window >= n:
+                return [(int(found_ids[i]), float(found_scores[i])) for i in picked]
+            window = min(n, window * 4)
+
+    def _rank_many(self, queries, top_k):
+        """
+        _rank for a (n_queries, dim) matrix: one matrix product (flat) or
+        one batched faiss search, widened per query only when needed.
+        """
+        if self.vectors is not None:
+            scores = self.vectors @ queries.T
+            return [
+                [(int(self.ids[i]), float(scores[i, j])) for i in rank_unique(np.ascontiguousarray(scores[:, j]), self.groups, top_k)]
+                for j in range(scores.shape[1])
+            ]
+
+        window = min(len(self.ids), top_k * 4)
+        scores, found = self.faiss_index.search(queries, window)
+        ranked = []
+        for j in range(len(queries)):
+            valid = found[j] >= 0
+            found_ids, found_scores = found[j][valid], scores[j][valid]
+            picked = first_per_group(range(len(found_ids)), self.groups[np.searchsorted(self.ids, found_ids)], top_k)
+            if len(picked) >= top_k or window >= len(self.ids):
+                ranked.append([(int(found_ids[i]), float(found_scores[i])) for i in picked])
+            else:
+                ranked.append(self._rank(queries[j], top_k))
+        return ranked
+
+    def _fetch(self, ranked_lists, conn):
+        """
+        [{chunk_id, source, text, score}, ...] per ranked list, with every
+        chunk's row read in one query.
+        """
+        wanted = sorted({cid for ranked in ranked_lists for cid, _ in ranked})
+        if not wanted:
+            return [[] for _ in ranked_lists]
+
+        own_conn = conn is None
+        conn = conn or get_conn()
+        cur = conn.cursor()
+        rows = {}
+        # Chunked to stay under SQLite's bound-parameter limit
+        for start in range(0, len(wanted), 900):
+            part = wanted[start:start + 900]
+            cur.execute(f"SELECT id, source, text FROM chunks WHERE id IN ({','.join('?' * len(part))})", part)
+            rows.update({cid: (source, text) for cid, source, text in cur.fetchall()})
+        if own_conn:
+            conn.close()
+
+        return [
+            [
+                {"chunk_id": cid, "source": rows[cid][0], "text": rows[cid][1], "score": score}
+                for cid, score in ranked
+                if cid in rows
+            ]
+            for ranked in ranked_lists
+        ]
+
+    def search_many(self, query_embeddings, top_k=5, conn=None):
+        """
+        Same contract as VectorStore.search_many: one result list per query.
+        """
+        if not len(self.ids) or top_k <= 0 or not len(query_embeddings):
+            return [[] for _ in query_embeddings]
+        queries = normalize_queries(query_embeddings, self.meta["dim"])
+        return self._fetch(self._rank_many(queries, top_k), conn)
+
+    def search(self, query_embedding, top_k=5, conn=None):
+        """
+        Same contract as VectorStore.search: [{chunk_id, source, text, score}, ...]
+        """
+        if not len(self.ids) or top_k <= 0:
+            return []
+
+        ranked = self._rank(normalize_query(query_embedding, self.meta["dim"]), top_k)
+        if not ranked:
+            return []
+
+        own_conn = conn is None
+        conn = conn or get_conn()
+        cur = conn.cursor()
+        cur.execute(
+            f"SELECT id, source, text FROM chunks WHERE id IN ({','.join('?' * len(ranked))})",
+            [cid for cid, _ in ranked]
+        )
+        rows = {cid: (source, text) for cid, source, text in cur.fetchall()}
+        if own_conn:
+            conn.close()
+
+        return [
+            {
+                "chunk_id": cid,
+                "source": rows[cid][0],
+                "text": rows[cid][1],
+                "score": score
+            }
+            for cid, score in ranked
+            if cid in rows
+        ]
+
+
+# One open index per process, reopened only when the sidecar is rebuilt
+_index = None
+_index_stamp = None
+_index_lock = threading.Lock()
+
+
+def get_kb_index(conn=None, index_dir=INDEX_DIR):
+    """
+    Lazily opens the index sidecar. Returns None when there is no index,
+    it was built from an older chunks table, or faiss is unavailable.
+    """
+    global _index, _index_stamp
+
+    meta_path = os.path.join(index_dir, "meta.json")
+    try:
+        stamp = (index_dir, os.stat(meta_path).st_mtime_ns)
+    except FileNotFoundError:
+        return None
+
+    if stamp != _index_stamp:
+        with _index_lock:
+            if stamp != _index_stamp:
+                with open(meta_path, encoding="utf-8") as f:
+                    meta = json.load(f)
+                if meta["kind"] != "flat" and faiss is None:
+                    _index = None
+                else:
+                    _index = KBIndex(index_dir, meta)
+                _index_stamp = stamp
+
+    if _index is None:
+        return None
+
+    own_conn = conn is None
+    conn = conn or get_conn()
+    version = get_chunks_version(conn)
+    if own_conn:
+        conn.close()
+    if list(version) != _index.meta["chunks_version"]:
+        return None
+    return _index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the knowledge-base vector index.")
+    parser.add_argument("--kind", choices=INDEX_KINDS, default="flat")
+    parser.add_argument("--index-dir", default=INDEX_DIR)
+    parser.add_argument("--nlist", type=int, default=None, help="IVF cell count")
+    parser.add_argument("--hnsw-m", type=int, default=32, help="HNSW neighbours per node")
+    args = parser.parse_args()
+
+    meta = build_index(args.kind, args.index_dir, nlist=args.nlist, hnsw_m=args.hnsw_m)
+    print(f"Built {meta['kind']} index over {meta['count']} chunks in {args.index_dir}")
+
+
+if __name__ == "__main__":
+    main()
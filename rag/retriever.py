@@ -1,7 +1,10 @@
-import json
 import math
-from .db import get_conn
-from .embedder import embed
+from .db import get_conn, encode_embedding, chunk_hash
+from .embedder import embed, embed_batch
+from .vector_store import get_vector_store
+from .index import get_kb_index
+from database.logger import log_retrieval, log_retrievals
+from database.tracing import span
 
 def cosine_similarity(vec1, vec2):
     dot = sum(a * b for a, b in zip(vec1, vec2))
@@ -13,8 +16,8 @@ def store_chunk(source, text, embedding):
     conn = get_conn()
     cur = conn.cursor()
     cur.execute(
-        "INSERT INTO chunks (source, text, embedding) VALUES (?, ?, ?)",
-        (source, text, json.dumps(embedding))
+        "INSERT INTO chunks (source, text, embedding_blob, embedding_dim, embedding_dtype, chunk_hash) VALUES (?, ?, ?, ?, ?, ?)",
+        (source, text, *encode_embedding(embedding), chunk_hash(text))
     )
     conn.commit()
     conn.close()
@@ -24,53 +27,30 @@ def build_vector_db(chunks):
         emb = embed(chunk)
         store_chunk(source, chunk, emb)
 
-def retrieve(query, top_k=5):
-    q_emb = embed(query)
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT id, source, text, embedding FROM chunks")
-    rows = cur.fetchall()
-
-    scored = []
-    for cid, source, text, emb_json in rows:
-        emb = json.loads(emb_json)
-        score = cosine_similarity(q_emb, emb)
-        scored.append({
-            "chunk_id": cid,
-            "source": source,
-            "text": text,
-            "score": score
-        })
-
-    # Sort by score descending
-    scored.sort(key=lambda x: x["score"], reverse=True)
-
-    # Deduplicate based on text
-    seen_texts = set()
-    unique_scored = []
-    for item in scored:
-        if item["text"] not in seen_texts:
-            unique_scored.append(item)
-            seen_texts.add(item["text"])
-        if len(unique_scored) >= top_k:
-            break
-
-    # Insert query into queries table
-    cur.execute(
-        "INSERT INTO queries (question) VALUES (?)",
-        (query,)
-    )
-    query_id = cur.lastrowid
+def retrieve(query, top_k=5, embedding=None):
+    """
+    Top-k unique chunks for a query. Pass `embedding` when the query
+    was already embedded (e.g. in a batch) to skip the embedding call.
+    """
+    with span("retrieve", top_k=top_k):
+        q_emb = embed(query) if embedding is None else embedding
+        conn = get_conn()
 
-    # Store only unique top-k retrievals in evidence_logs
-    for r in unique_scored:
-        cur.execute(
-            "INSERT INTO evidence_logs (query_id, chunk_id, score) VALUES (?, ?, ?)",
-            (query_id, r["chunk_id"], r["score"])
-        )
+        # Prefer the memory-mapped index sidecar; fall back to the in-process
+        # matrix when no up-to-date index has been built
+        with span("retrieve.search") as sp:
+            index = get_kb_index(conn)
+            if index is not None:
+                sp["source"] = f"index:{index.kind}"
+                unique_scored = index.search(q_emb, top_k, conn=conn)
+            else:
+                sp["source"] = "vector_store"
+                unique_scored = get_vector_store().search(q_emb, top_k, conn=conn)
 
-    conn.commit()
-    conn.close()
+        conn.close()
+
+        # Query + unique top-k retrievals are logged by the background writer
+        log_retrieval(query, unique_scored)
 
    # Return simplified evidence list
     return [
@@ -83,3 +63,68 @@ def retrieve(query, top_k=5):
         for r in unique_scored
     ]
 
+
+def _simplify(results):
+    return [
+        {
+            "chunk_id": r["chunk_id"],
+            "source": r["source"],
+            "text": r["text"],
+            "score": r["score"]
+        }
+        for r in results
+    ]
+
+
+def fuse_rankings(rankings, top_k=None, rrf_k=60):
+    """
+    Reciprocal rank fusion: each chunk scores sum(1 / (rrf_k + rank)) over
+    the rankings it appears in (rank from 1). Fused entries keep their best
+    similarity as "score" and add "rrf_score" and "hits" (rankings found in).
+    """
+    fused = {}
+    for ranking in rankings:
+        for rank, r in enumerate(ranking, start=1):
+            entry = fused.get(r["chunk_id"])
+            if entry is None:
+                entry = fused[r["chunk_id"]] = dict(r, rrf_score=0.0, hits=0)
+            entry["rrf_score"] += 1.0 / (rrf_k + rank)
+            entry["score"] = max(entry["score"], r["score"])
+            entry["hits"] += 1
+
+    ranked = sorted(fused.values(), key=lambda e: (e["rrf_score"], e["score"]), reverse=True)
+    return ranked[:top_k] if top_k else ranked
+
+
+def retrieve_many(queries, top_k=5, fused_top_k=None, rrf_k=60):
+    """
+    retrieve() for several queries at once: one embedding batch, one
+    matrix-matrix product against the corpus and one logging transaction.
+    Returns {"per_query": [results per query], "fused": RRF ranking}.
+    """
+    queries = list(queries)
+    with span("retrieve_many", queries=len(queries), top_k=top_k):
+        if not queries:
+            return {"per_query": [], "fused": []}
+
+        embeddings = embed_batch(queries)
+        conn = get_conn()
+
+        with span("retrieve.search") as sp:
+            index = get_kb_index(conn)
+            if index is not None:
+                sp["source"] = f"index:{index.kind}"
+                per_query = index.search_many(embeddings, top_k, conn=conn)
+            else:
+                sp["source"] = "vector_store"
+                per_query = get_vector_store().search_many(embeddings, top_k, conn=conn)
+
+        conn.close()
+
+        log_retrievals(zip(queries, per_query))
+
+    per_query = [_simplify(results) for results in per_query]
+    return {
+        "per_query": per_query,
+        "fused": fuse_rankings(per_query, top_k=fused_top_k or top_k, rrf_k=rrf_k),
+    }
@@ -0,0 +1,219 @@
+import threading
+import numpy as np
+from .db import get_conn, get_chunks_version, decode_embedding
+
+
+def load_chunk_matrix(conn):
+    """
+    Reads every stored embedding into (ids, sources, texts, text groups,
+    normalized float32 matrix), ordered by chunk id.
+    """
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT id, source, text, embedding_blob, embedding_dim, embedding_dtype
+        FROM chunks
+        WHERE embedding_blob IS NOT NULL
+        ORDER BY id
+    """)
+
+    ids, sources, texts, groups, blobs, layouts = [], [], [], [], [], set()
+    text_groups = {}
+    for cid, source, text, blob, dim, dtype in cur.fetchall():
+        ids.append(cid)
+        sources.append(source)
+        texts.append(text)
+        # Rows sharing a text share a group, so search can deduplicate
+        groups.append(text_groups.setdefault(text, len(text_groups)))
+        blobs.append((blob, dim, dtype))
+        layouts.add((dim, dtype))
+
+    if not blobs:
+        matrix = np.empty((0, 0), dtype=np.float32)
+    elif len(layouts) == 1:
+        # Uniform rows: one frombuffer view over the concatenated BLOBs
+        dim, dtype = layouts.pop()
+        raw = b"".join(blob for blob, _, _ in blobs)
+        matrix = decode_embedding(raw, None, dtype).reshape(len(blobs), dim)
+    else:
+        matrix = np.vstack([decode_embedding(*b) for b in blobs])
+
+    matrix = matrix.astype(np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix = np.ascontiguousarray(matrix / norms, dtype=np.float32)
+
+    return (
+        np.asarray(ids, dtype=np.int64),
+        sources,
+        texts,
+        np.asarray(groups, dtype=np.int64),
+        matrix
+    )
+
+
+def normalize_query(query_embedding, dim):
+    """
+    float32, unit-length copy of a query embedding.
+    """
+    q = np.asarray(query_embedding, dtype=np.float32)
+    if q.shape[0] != dim:
+        raise ValueError(
+            f"Query embedding has {q.shape[0]} dims, knowledge base has {dim}"
+        )
+    q_norm = np.linalg.norm(q)
+    return q / q_norm if q_norm else q
+
+
+def normalize_queries(query_embeddings, dim):
+    """
+    float32 (n_queries, dim) matrix of unit-length query embeddings.
+    """
+    q = np.asarray(query_embeddings, dtype=np.float32)
+    if q.ndim != 2 or q.shape[1] != dim:
+        raise ValueError(
+            f"Query embeddings have shape {q.shape}, knowledge base has {dim} dims"
+        )
+    norms = np.linalg.norm(q, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return q / norms
+
+
+def first_per_group(order, groups, top_k):
+    """
+    Walks row positions best-first and keeps the first row of each text group.
+    """
+    picked, seen = [], set()
+    for i in order:
+        if groups[i] in seen:
+            continue
+        seen.add(groups[i])
+        picked.append(i)
+        if len(picked) >= top_k:
+            break
+    return picked
+
+
+def rank_unique(scores, groups, top_k):
+    """
+    Positions of the best top_k rows, at most one per distinct text.
+    Partitions a small candidate window first and widens it only
+    when duplicates crowd out unique texts.
+    """
+    n = len(scores)
+    window = min(n, top_k * 4)
+    while True:
+        if window < n:
+            top = np.argpartition(-scores, window - 1)[:window]
+        else:
+            top = np.arange(n)
+        # Best score first; ties go to the earliest stored chunk
+        top = top[np.lexsort((top, -scores[top]))]
+
+        picked = first_per_group(top, groups, top_k)
+        if len(picked) >= top_k or window >= n:
+            return picked
+        window = min(n, window * 4)
+
+
+def top_unique(scores, ids, sources, texts, groups, top_k):
+    return [
+        {
+            "chunk_id": int(ids[i]),
+            "source": sources[i],
+            "text": texts[i],
+            "score": float(scores[i])
+        }
+        for i in rank_unique(scores, groups, top_k)
+    ]
+
+
+class VectorStore:
+    """
+    Memory-resident view of the chunks table:
+    - one contiguous, L2-normalized float32 matrix of embeddings
+    - parallel arrays of chunk ids, sources and texts
+    Reloaded only when the chunks table changes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        # (ids, sources, texts, text groups, matrix) swapped atomically on reload
+        self._snapshot = (
+            np.empty(0, dtype=np.int64),
+            [],
+            [],
+            np.empty(0, dtype=np.int64),
+            np.empty((0, 0), dtype=np.float32)
+        )
+
+    # ----------------------------------
+    # Loading
+    # ----------------------------------
+    def refresh(self, conn=None):
+        """
+        Reloads the matrix if the chunks table changed since the last load.
+        """
+        own_conn = conn is None
+        conn = conn or get_conn()
+        try:
+            version = get_chunks_version(conn)
+            if version == self._version:
+                return
+            with self._lock:
+                if version == self._version:
+                    return
+                self._snapshot = load_chunk_matrix(conn)
+                self._version = version
+        finally:
+            if own_conn:
+                conn.close()
+
+    def __len__(self):
+        return len(self._snapshot[0])
+
+    # ----------------------------------
+    # Search
+    # ----------------------------------
+    def search(self, query_embedding, top_k=5, conn=None):
+        """
+        Returns the top_k chunks by cosine similarity, best first:
+        [{chunk_id, source, text, score}, ...]
+        """
+        self.refresh(conn)
+        ids, sources, texts, groups, matrix = self._snapshot
+        if not len(ids) or top_k <= 0:
+            return []
+
+        scores = matrix @ normalize_query(query_embedding, matrix.shape[1])
+        return top_unique(scores, ids, sources, texts, groups, top_k)
+
+    def search_many(self, query_embeddings, top_k=5, conn=None):
+        """
+        search() for several queries with one matrix-matrix product.
+        Returns one result list per query, in query order.
+        """
+        self.refresh(conn)
+        ids, sources, texts, groups, matrix = self._snapshot
+        if not len(ids) or top_k <= 0 or not len(query_embeddings):
+            return [[] for _ in query_embeddings]
+
+        scores = matrix @ normalize_queries(query_embeddings, matrix.shape[1]).T
+        return [
+            top_unique(np.ascontiguousarray(scores[:, j]), ids, sources, texts, groups, top_k)
+            for j in range(scores.shape[1])
+        ]
+
+
+# One store per process, shared by every Streamlit session
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_vector_store() -> VectorStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = VectorStore()
+    return _store
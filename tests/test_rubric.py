@@ -0,0 +1,193 @@
+"""
+The default rubric must reproduce the judge's original hard-coded scoring
+exactly, values and int/float types alike, since scores_json and re-judged
+verdicts are compared against hearings scored before rubrics existed.
+
+    python -m pytest tests/test_rubric.py
+"""
+import random
+import pytest
+import rag.db
+from rag.db import init_db
+from database.logger import flush_logs
+from agents.rubric import get_rubric
+from agents.judge import JudgeAgent
+
+CASES = 20000
+
+LEGAL_KEYWORDS = (
+    "law", "section", "act", "rule",
+    "traffic", "penalty", "fine",
+    "violation", "offence"
+)
+
+DEFENSE_KEYWORDS = (
+    "however", "no evidence", "not proven",
+    "reasonable doubt", "lack", "insufficient",
+    "no witness", "procedural error"
+)
+
+WORDS = (
+    "the", "driver", "Driver", "SPEED", "limit", "motorway", "signal", "red", "helmet",
+    "ticket", "officer", "report", "no", "evidence", "reasonable", "doubt", "not", "proven",
+    "procedural", "error", "witness", "Section", "183", "PKR", "500", "Act.", "Rule,",
+    "LAW", "faction", "refined", "lacking", "however,", "ΟΔΟΣ", "straße", "İstanbul",
+)
+
+
+# ----------------------------------
+# The judge's scoring before rubric specs, verbatim
+# ----------------------------------
+def baseline_score(prosecutor_text, defense_text, evidence, case_facts):
+    evidence_strength = min(sum(e.get("score", 0) for e in evidence) * 100, 100)
+
+    legal_application = 50
+    if any(k in prosecutor_text.lower() for k in LEGAL_KEYWORDS):
+        legal_application += 25
+    legal_application = min(legal_application, 100)
+
+    defense_effectiveness = 50
+    if any(k in defense_text.lower() for k in DEFENSE_KEYWORDS):
+        defense_effectiveness += 20
+    defense_effectiveness = min(defense_effectiveness, 100)
+
+    case_words = set(word.lower() for word in case_facts.split())
+    prosecutor_words = set(word.lower() for word in prosecutor_text.split())
+    defense_words = set(word.lower() for word in defense_text.split())
+
+    matches = len(case_words & (prosecutor_words | defense_words))
+    consistency = min((matches / len(case_words)) * 100, 100) if case_words else 50
+
+    credibility = 50
+    if evidence and any(e.get("verified", False) for e in evidence):
+        credibility += 20
+    credibility = min(credibility, 100)
+
+    return {
+        "evidence_strength": round(evidence_strength, 2),
+        "legal_application": round(legal_application, 2),
+        "defense_effectiveness": round(defense_effectiveness, 2),
+        "consistency": round(consistency, 2),
+        "credibility": round(credibility, 2),
+    }
+
+
+def baseline_decide(scores):
+    final_score = (
+        scores["evidence_strength"] * 0.35 +
+        scores["legal_application"] * 0.25 +
+        scores["consistency"] * 0.15 +
+        scores["credibility"] * 0.25 -
+        scores["defense_effectiveness"] * 0.2
+    )
+    prosecution_score = (scores["evidence_strength"] + scores["legal_application"]) / 2
+    defense_score = scores["defense_effectiveness"]
+
+    if prosecution_score > defense_score:
+        verdict = "Violation Confirmed"
+    elif prosecution_score < defense_score:
+        verdict = "Violation Not Confirmed"
+    else:
+        verdict = "Benefit of doubt granted"
+    return final_score, prosecution_score, defense_score, verdict
+
+
+# ----------------------------------
+# Random hearings
+# ----------------------------------
+def _text(rng, keywords):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(0, 30))]
+    if rng.random() < 0.4:
+        words.insert(rng.randint(0, len(words)), rng.choice(keywords).upper() if rng.random() < 0.3 else rng.choice(keywords))
+    return " ".join(words)
+
+
+def _evidence(rng):
+    evidence = []
+    for _ in range(rng.choice((0, 0, 1, 2, 3, 5, 8))):
+        item = {"chunk_id": rng.randint(1, 10**6), "text": "", "source": "kb.txt"}
+        roll = rng.random()
+        if roll < 0.75:
+            item["score"] = rng.random() * rng.choice((0.05, 0.3, 1.0))
+        elif roll < 0.85:
+            item["score"] = rng.choice((0, 1))
+        elif roll < 0.9:
+            item["score"] = rng.choice((0.0, -0.0, 1e-9, 0.995))
+        if rng.random() < 0.5:
+            item["verified"] = rng.random() < 0.3
+        evidence.append(item)
+    return evidence
+
+
+def random_hearings(n, seed=0):
+    rng = random.Random(seed)
+    hearings = []
+    for _ in range(n):
+        case_facts = "" if rng.random() < 0.05 else " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 25)))
+        hearings.append((
+            case_facts,
+            _text(rng, LEGAL_KEYWORDS),
+            _text(rng, DEFENSE_KEYWORDS),
+            _evidence(rng),
+        ))
+    return hearings
+
+
+def _typed(values):
+    # 100 and 100.0 compare equal but serialize differently in scores_json
+    return [(type(v).__name__, repr(v)) for v in values]
+
+
+# ----------------------------------
+# Tests
+# ----------------------------------
+@pytest.fixture(autouse=True)
+def scratch_db(tmp_path, monkeypatch):
+    # Spans and audit writes go to a throwaway database, never database/courtroom.db
+    monkeypatch.setenv("COURTROOM_TRACING", "0")
+    monkeypatch.setattr(rag.db, "DB_PATH", str(tmp_path / "courtroom.db"))
+    init_db()
+    yield
+    flush_logs()
+
+
+def test_score_and_decide_match_baseline():
+    rubric = get_rubric("default")
+    for case_facts, prosecutor_text, defense_text, evidence in random_hearings(CASES, seed=1):
+        expected = baseline_score(prosecutor_text, defense_text, evidence, case_facts)
+        scores = rubric.score(case_facts, prosecutor_text, defense_text, evidence)
+
+        assert list(scores) == list(expected)
+        assert _typed(scores.values()) == _typed(expected.values())
+        assert _typed(rubric.decide(scores)) == _typed(baseline_decide(expected))
+
+
+def test_score_batch_matches_baseline():
+    hearings = random_hearings(CASES, seed=2)
+    results = get_rubric("default").score_batch(hearings)
+
+    assert len(results) == len(hearings)
+    for (case_facts, prosecutor_text, defense_text, evidence), result in zip(hearings, results):
+        expected = baseline_score(prosecutor_text, defense_text, evidence, case_facts)
+        final_score, prosecution_score, defense_score, verdict = baseline_decide(expected)
+
+        assert _typed(result["scores"].values()) == _typed(expected.values())
+        assert _typed((result["final_score"], result["prosecution_score"], result["defense_score"])) == \
+            _typed((final_score, prosecution_score, defense_score))
+        assert result["verdict"] == verdict
+
+
+def test_judge_batch_matches_evaluate_scoring():
+    # evaluate scores with _score_arguments/_decide; score_batch must agree
+    judge = JudgeAgent(llm=None)
+    hearings = random_hearings(2000, seed=3)
+    results = judge.score_batch(hearings)
+
+    for (case_facts, prosecutor_text, defense_text, evidence), result in zip(hearings, results):
+        scores = judge._score_arguments(prosecutor_text, defense_text, evidence, case_facts)
+        final_score, prosecution_score, _, verdict = judge._decide(scores)
+
+        assert _typed(result["scores"].values()) == _typed(scores.values())
+        assert repr(result["final_score"]) == repr(final_score)
+        assert repr(result["prosecution_score"]) == repr(prosecution_score)
+        assert result["verdict"] == verdict
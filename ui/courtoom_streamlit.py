@@ -3,7 +3,7 @@ import streamlit as st
 import sys
 import os
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 # 🔊 Voice support
 from gtts import gTTS
@@ -20,6 +20,10 @@ sys.path.append(os.path.join(current_dir, 'agents'))  # Agents
 sys.path.append(os.path.join(current_dir, 'rag'))  # RAG
 sys.path.append(os.path.join(current_dir, 'models'))  # Models
 
+# ⏱️ Per-stage latency spans (stored in the metrics table)
+from database.tracing import span, stage_summary, histogram, histogram_csv
+import json
+
 
 # ======================
 # 🔊 TEXT TO SPEECH
@@ -31,11 +35,12 @@ def speak_text(text: str, role: str):
         return
 
     try:
-        tts = gTTS(text=f"{role} says. {text}", lang="en")
-        audio = io.BytesIO()
-        tts.write_to_fp(audio)
-        audio.seek(0)
-        st.audio(audio, format="audio/mp3")
+        with span("ui.speak_text", debate_id=st.session_state.get("debate_id"), role=role, chars=len(text)):
+            tts = gTTS(text=f"{role} says. {text}", lang="en")
+            audio = io.BytesIO()
+            tts.write_to_fp(audio)
+            audio.seek(0)
+            st.audio(audio, format="audio/mp3")
     except Exception as e:
         st.warning(f"Voice error: {e}")
 
@@ -44,7 +49,8 @@ def speak_text(text: str, role: str):
 # FIX 2: IMPORT ALL YOUR MODULES
 # ======================
 try:
-    from rag.fact_witness import fact_witness_answer
+    from rag.fact_witness import fact_witness_answer, fact_witness_many
+    from rag.evidence import merge_evidence, manual_evidence
     from rag.retriever import retrieve
     from rag.db import init_db, get_conn
     print("✅ RAG modules imported")
@@ -53,11 +59,12 @@ except Exception as e:
     fact_witness_answer = None
 
 try:
-    from llm_openrouter import lc_llm
+    from llm_openrouter import lc_llm, lc_llm_stream
     print("✅ LLM imported")
 except Exception as e:
     st.error(f"LLM import error: {e}")
     lc_llm = None
+    lc_llm_stream = None
 
 try:
     from agents.debate_pipeline import DebatePipeline
@@ -85,6 +92,18 @@ def initialize_database():
 
 db_initialized = initialize_database()
 
+# ======================
+# ⏱️ LATENCY HISTOGRAM
+# ======================
+HISTOGRAM_DAYS = 7
+
+@st.cache_data(ttl=60)
+def recent_histogram(days: int = HISTOGRAM_DAYS):
+    """Latency histogram of the last `days` days, rescanned at most once a minute"""
+    # metrics.timestamp is SQLite's CURRENT_TIMESTAMP, i.e. UTC
+    since = (datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+    return histogram(since=since)
+
 # ======================
 # STREAMLIT UI
 # ======================
@@ -141,15 +160,12 @@ with st.sidebar:
     
     # Manual evidence
     st.subheader("Add Evidence")
-    manual_evidence = st.text_area("Evidence text:", height=80)
+    manual_evidence_text = st.text_area("Evidence text:", height=80)
     if st.button("➕ Add Manual Evidence"):
-        if manual_evidence:
-            st.session_state.evidence.append({
-                "text": manual_evidence,
-                "score": 0.9,
-                "source": "Manual Entry",
-                "chunk_id": len(st.session_state.evidence)
-            })
+        if manual_evidence_text:
+            st.session_state.evidence = merge_evidence(
+                st.session_state.evidence, [manual_evidence(manual_evidence_text)]
+            )
             st.success("Evidence added!")
             st.rerun()
     
@@ -160,8 +176,9 @@ with st.sidebar:
         if fact_witness_answer and search_query:
             with st.spinner(f"Searching for '{search_query}'..."):
                 try:
-                    results = fact_witness_answer(search_query)
-                    st.session_state.evidence.extend(results)
+                    with span("ui.search_database"):
+                        results = fact_witness_answer(search_query)
+                    st.session_state.evidence = merge_evidence(st.session_state.evidence, results)
                     st.success(f"Found {len(results)} relevant laws")
                     st.rerun()
                 except Exception as e:
@@ -233,10 +250,10 @@ with col1:
                     if word in case_text.lower():
                         keywords.append(word)
                 
-                # Search for each keyword
-                for keyword in keywords:
-                    results = fact_witness_answer(keyword)
-                    st.session_state.evidence.extend(results)
+                # Search all keywords in one batch; chunks found twice are merged
+                with span("ui.auto_search", keywords=len(keywords)):
+                    results = fact_witness_many(keywords)
+                    st.session_state.evidence = merge_evidence(st.session_state.evidence, results)
                 
                 if keywords:
                     st.success(f"Added laws for keywords: {', '.join(keywords)}")
@@ -277,38 +294,59 @@ with col2:
         disabled=not system_ready,
         use_container_width=True
     ):
-        with st.spinner("Court is in session..."):
-            try:
-                # Create unique debate ID
-                debate_id = f"case_{uuid.uuid4().hex[:8]}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                
-                # Create pipeline with your actual agents
-                pipeline = DebatePipeline(llm=lc_llm, debate_id=debate_id)
-                
-                # Add all evidence
-                for ev in st.session_state.evidence:
-                    pipeline.submit_evidence(ev)
-                
-                # Run debate with multiple rounds
-                judgement = pipeline.run(
-                    case_facts=case_text,
-                    rounds=st.session_state.rounds
-                )
-                
-                # Store results
-                st.session_state.judgement = judgement
-                st.session_state.debate_log = pipeline.hearing_log
-                st.session_state.debate_id = debate_id
-                
-                st.success("✅ Court proceedings completed!")
-                st.balloons()
-                st.rerun()
-                
-            except Exception as e:
-                st.error(f"Courtroom error: {str(e)}")
-                import traceback
-                with st.expander("Technical details"):
-                    st.code(traceback.format_exc())
+        st.caption("Court is in session...")
+        try:
+            # Create unique debate ID
+            debate_id = f"case_{uuid.uuid4().hex[:8]}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            
+            # Create pipeline with your actual agents (arguments stream token by token)
+            pipeline = DebatePipeline(llm=lc_llm, debate_id=debate_id, stream_llm=lc_llm_stream)
+            
+            # Add all evidence
+            for ev in st.session_state.evidence:
+                pipeline.submit_evidence(ev)
+            
+            # Run debate with multiple rounds, rendering each turn as it arrives
+            speaker_labels = {
+                "prosecutor": "##### 👨‍⚖️ Prosecutor",
+                "defense": "##### 🛡️ Defense",
+                "judge": "##### ⚖️ Judge",
+            }
+            judgement = None
+            live_text = None
+            buffer = ""
+            for event in pipeline.run_events(
+                case_facts=case_text,
+                rounds=st.session_state.rounds
+            ):
+                if event["type"] == "turn_start":
+                    st.markdown(f"{speaker_labels[event['agent']]} (round {event['round']})")
+                    live_text = st.empty()
+                    buffer = ""
+                elif event["type"] == "token":
+                    buffer += event["text"]
+                    live_text.markdown(buffer + "▌")
+                elif event["type"] == "turn_end":
+                    live_text.markdown(event["text"])
+                elif event["type"] == "verdict":
+                    st.info(f"Verdict: {event['verdict']}")
+                elif event["type"] == "judgement":
+                    judgement = event["judgement"]
+            
+            # Store results
+            st.session_state.judgement = judgement
+            st.session_state.debate_log = pipeline.hearing_log
+            st.session_state.debate_id = debate_id
+            
+            st.success("✅ Court proceedings completed!")
+            st.balloons()
+            st.rerun()
+            
+        except Exception as e:
+            st.error(f"Courtroom error: {str(e)}")
+            import traceback
+            with st.expander("Technical details"):
+                st.code(traceback.format_exc())
 
 # ======================
 # DISPLAY RESULTS
@@ -366,7 +404,7 @@ if st.session_state.judgement:
         st.metric("Defense Score", f"{judgement.defense_score:.1f}")
         
     # Tabs for detailed view
-    tab1, tab2, tab3, tab4 = st.tabs(["📄 Judgement", "🗣️ Debate", "📊 Analysis", "🔍 Evidence"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["📄 Judgement", "🗣️ Debate", "📊 Analysis", "🔍 Evidence", "⏱️ Performance"])
     
     with tab1:
         st.subheader("Judge's Legal Reasoning")
@@ -428,6 +466,39 @@ if st.session_state.judgement:
         else:
             st.info("No evidence details available")
     
+    with tab5:
+        debate_id = st.session_state.get("debate_id")
+        summary = stage_summary(debate_id) if debate_id else []
+        if summary:
+            st.subheader("Time per Stage")
+            st.dataframe(
+                [
+                    {
+                        "Stage": s["stage"],
+                        "Calls": s["count"],
+                        "Total (ms)": s["total_ms"],
+                        "p50 (ms)": s["p50_ms"],
+                        "p95 (ms)": s["p95_ms"],
+                        "p99 (ms)": s["p99_ms"],
+                        "Tokens in/out": f"{s['prompt_tokens']}/{s['completion_tokens']}",
+                        "Queue wait (ms)": s["mean_queue_wait_ms"],
+                    }
+                    for s in summary
+                ],
+                use_container_width=True
+            )
+
+            # Latency histogram across recent hearings, for export
+            hist = recent_histogram()
+            st.caption(f"Histogram covers the last {HISTOGRAM_DAYS} days of hearings")
+            col_json, col_csv = st.columns(2)
+            with col_json:
+                st.download_button("⬇️ Histogram (JSON)", json.dumps(hist, indent=2), "latency_histogram.json", "application/json")
+            with col_csv:
+                st.download_button("⬇️ Histogram (CSV)", histogram_csv(hist), "latency_histogram.csv", "text/csv")
+        else:
+            st.info("No timing data recorded for this hearing")
+    
     # New case button
     if st.button("🔄 Start New Case", type="secondary"):
         st.session_state.evidence = []